@@ -7,5 +7,13 @@ including image selection, opacity adjustment, blur effects, and enable/disable
 """
 
 from .background_manager import BackgroundManager, get_background_manager
+from .background_profile import BackgroundProfile
+from .thumbnail_loader import ThumbnailLoader
+from .memory_policy import MemoryTrimPolicy
+from .trace import Tracer, tracer, traced
+from .pixel_format import PixelFormatStats, pixel_formats
+from .video_background import VideoBackground
 
-__all__ = ['BackgroundManager', 'get_background_manager'] 
\ No newline at end of file
+__all__ = ['BackgroundManager', 'get_background_manager', 'BackgroundProfile', 'ThumbnailLoader',
+           'MemoryTrimPolicy', 'Tracer', 'tracer', 'traced', 'PixelFormatStats', 'pixel_formats',
+           'VideoBackground'] 
\ No newline at end of file
@@ -4,14 +4,97 @@ Background Manager - Handles application background image, blur effects and opac
 """
 
 import os
+import math
 import logging
 from pathlib import Path
-from PyQt5.QtCore import QObject, pyqtSignal, QSize
-from PyQt5.QtGui import QPixmap, QPainter
+from PyQt5.QtCore import (QObject, pyqtSignal, QSize, QByteArray, QBuffer, QIODevice, 
+                          QRunnable, QThreadPool, QTimer, QRect)
+from PyQt5.QtGui import QPixmap, QPainter, QImage, QColor
 from PyQt5.QtCore import Qt
+from qfluentwidgets import qconfig, isDarkTheme
+
+from .background_profile import BackgroundProfile
+from .image_decoder import decode_image, get_image_size
+from .render_cache import PersistentRenderCache
+from .shared_cache import SharedRenderCache
+from .trace import tracer, traced
+from .pixel_format import pixel_formats
+from . import tiled_blur, video_background
 
 logger = logging.getLogger(__name__)
 
+# Image file extensions accepted as background sources
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
+
+# Display modes of the background image
+DISPLAY_MODES = ["Stretch", "Keep Aspect Ratio", "Tile", "Original Size", "Fit Window"]
+
+
+class ThemeVariantSignals(QObject):
+    """Signals of theme variant worker tasks (lives in the GUI thread)"""
+    
+    # Emitted with (cache generation, cache key, is preview render, variant image)
+    variantReady = pyqtSignal(int, str, bool, QImage)
+
+
+class ThemeVariantTask(QRunnable):
+    """Worker task precomputing a theme variant of a rendered background"""
+    
+    def __init__(self, generation: int, cache_key: str, preview: bool, image: QImage, variant: str, 
+                 signals: ThemeVariantSignals):
+        super().__init__()
+        self.generation = generation
+        self.cache_key = cache_key
+        self.preview = preview
+        self.image = image
+        self.variant = variant
+        self.signals = signals
+        
+    def run(self):
+        try:
+            with tracer.span("theme variant", variant=self.variant):
+                image = BackgroundManager.create_theme_variant(self.image, self.variant)
+            self.signals.variantReady.emit(self.generation, self.cache_key, self.preview, image)
+        except Exception as e:
+            logger.error(f"Failed to create {self.variant} background variant: {str(e)}")
+
+
+class RenderSignals(QObject):
+    """Signals of render worker tasks (lives in the GUI thread)"""
+    
+    # Emitted with (cache generation, cache key, render)
+    renderReady = pyqtSignal(int, str, QImage)
+
+
+class RenderTask(QRunnable):
+    """Worker task rendering a background from its source, e.g. to replace a lossy restored render"""
+    
+    def __init__(self, generation: int, base_key: str, render_args: tuple, variants: list, 
+                 signals: RenderSignals):
+        super().__init__()
+        self.generation = generation
+        self.base_key = base_key
+        self.render_args = render_args
+        self.variants = variants
+        self.signals = signals
+        
+    def run(self):
+        try:
+            image = BackgroundManager.render_image(*self.render_args)
+            if image.isNull():
+                return
+                
+            # Theme variants of one render share its decode, scale and blur
+            for variant in self.variants:
+                if variant:
+                    with tracer.span("theme variant", variant=variant):
+                        result = BackgroundManager.create_theme_variant(image, variant)
+                    self.signals.renderReady.emit(self.generation, f"{self.base_key}_{variant}", result)
+                else:
+                    self.signals.renderReady.emit(self.generation, self.base_key, image)
+        except Exception as e:
+            logger.error(f"Failed to render background on a worker thread: {str(e)}")
+
 
 class BackgroundManager(QObject):
     """Background manager - Unified management of background related settings and styles"""
@@ -19,12 +102,73 @@ class BackgroundManager(QObject):
     # Signal emitted when background settings change
     backgroundChanged = pyqtSignal()
     
+    # Signal emitted when cached renders are dropped, pixmaps kept from earlier calls must be released
+    rendersReleased = pyqtSignal()
+    
+    # Signal emitted when a video background has a new frame to paint
+    videoFrameReady = pyqtSignal()
+    
+    CACHE_LIMIT = 6             # Maximum number of committed renders kept in memory
+    SOURCE_CACHE_LIMIT = 2      # Maximum number of decoded source images kept in memory
+    PREVIEW_SCALE = 4           # Low-resolution previews are rendered at 1/4 of the final resolution
+    PREVIEW_CACHE_LIMIT = 8     # Maximum number of preview renders kept in memory
+    PRERENDER_DELAY = 150       # Milliseconds without new renders before neighbouring routes are rendered
+    
+    # Setting names accepted by begin_preview, mapped to their config items
+    PREVIEW_SETTINGS = {
+        'enabled': 'backgroundImageEnabled',
+        'image_path': 'backgroundImagePath',
+        'opacity': 'backgroundOpacity',
+        'blur_radius': 'backgroundBlurRadius',
+        'display_mode': 'backgroundDisplayMode',
+        'theme_adaptive': 'backgroundThemeAdaptive',
+    }
+    
+    # Theme variants as (brightness overlay, soft light tint), applied on top of the blurred render
+    THEME_VARIANTS = {
+        'light': (QColor(255, 255, 255, 56), QColor(255, 255, 255, 40)),
+        'dark': (QColor(0, 0, 0, 96), QColor(0, 0, 0, 64)),
+    }
+    
     def __init__(self, config_manager=None):
         super().__init__()
         self.config_manager = config_manager
         self._background_style_cache = {}
         self._blurred_pixmap_cache = {}  # Cache for blurred images
         self._current_blur_key = None    # Current blur image cache key
+        self._restored_keys = {}         # Cache key -> shared key of renders restored from lossy compact copies
+        self._preview_pixmap_cache = {}  # Cache for preview renders, kept apart from committed ones
+        self._preview_overrides = {}     # Settings previewed instead of the configured ones
+        self._previewing = False
+        self._preview_low_resolution = False
+        self._current_preview_key = None # Full-resolution preview render promoted on commit
+        self._preview_source = None      # (key, QImage) scaled source reused by low-resolution previews
+        self._compact_cache = {}         # Compressed copies of renders dropped by trim_memory
+        self._source_cache = {}          # Decoded sources as path -> (modified time, full size flag, QImage)
+        self._cache_generation = 0       # Incremented on clear_cache to discard stale worker results
+        self._render_cache = PersistentRenderCache()  # Renders written by the batch pre-renderer
+        self._shared_cache = None        # Renders shared with other instances, see set_shared_cache_enabled
+        self._shared_keys = {}           # Committed cache key -> segment key of renders backed by shared memory
+        self._profiles = {}              # Profile name -> BackgroundProfile
+        self._route_profiles = {}        # Route key -> profile name
+        self._current_route = None
+        self._neighbour_routes = []      # Routes rendered ahead of navigation
+        self._prerender_queue = []
+        self._prerendering = False
+        self._last_request = None        # (window size, device pixel ratio) of the last committed render
+        self._video = None               # VideoBackground, created when a video is first shown
+        self._video_frame_rate = video_background.VideoBackground.DEFAULT_FRAME_RATE
+        
+        self._prerender_timer = QTimer(self)
+        self._prerender_timer.setSingleShot(True)
+        self._prerender_timer.setInterval(self.PRERENDER_DELAY)
+        self._prerender_timer.timeout.connect(self._prerender_next_route)
+        
+        self._variant_signals = ThemeVariantSignals(self)
+        self._variant_signals.variantReady.connect(self._on_theme_variant_ready)
+        self._render_signals = RenderSignals(self)
+        self._render_signals.renderReady.connect(self._on_render_ready)
+        qconfig.themeChangedFinished.connect(self._on_theme_changed)
         
     def validate_image_path(self, image_path: str) -> bool:
         """Validate if the image path is valid
@@ -33,7 +177,7 @@ class BackgroundManager(QObject):
             image_path: Path to the image file
             
         Returns:
-            bool: True if the path is valid and points to a supported image format
+            bool: True if the path is valid and points to a supported image or, with QtMultimedia, video format
         """
         if not image_path:
             return False
@@ -43,8 +187,9 @@ class BackgroundManager(QObject):
             return False
             
         # Check if it's a supported image format
-        supported_formats = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp'}
-        return path.suffix.lower() in supported_formats
+        suffix = path.suffix.lower()
+        return suffix in SUPPORTED_FORMATS or (suffix in video_background.VIDEO_FORMATS and 
+                                               video_background.is_available())
     
     def get_background_style(self, theme_mode="light") -> str:
         """Generate background stylesheet (background image implemented via paintEvent)
@@ -74,18 +219,109 @@ class BackgroundManager(QObject):
         """Clear background style cache and blurred image cache"""
         self._background_style_cache.clear()
         self._blurred_pixmap_cache.clear()
+        self._preview_pixmap_cache.clear()
+        self._preview_source = None
+        self._compact_cache.clear()
+        self._source_cache.clear()
+        self._release_shared_renders()
         self._current_blur_key = None
+        self._restored_keys.clear()
+        self._cache_generation += 1
+        self.rendersReleased.emit()
         logger.debug("Background style cache and blurred image cache cleared")
     
+    def trim_memory(self):
+        """Drop all sized renders, keeping only a compressed copy of the current background
+        
+        The compressed copy is decoded on the next request for the same render, which is much
+        cheaper than decoding, scaling and blurring the source again.
+        """
+        current_pixmap = self._blurred_pixmap_cache.get(self._current_blur_key)
+        if current_pixmap is not None and self._current_blur_key not in self._compact_cache:
+            data = self._compress_pixmap(current_pixmap)
+            self._compact_cache = {}
+            if data is not None:
+                self._compact_cache[self._current_blur_key] = (data, current_pixmap.devicePixelRatio())
+            
+        released = self.get_memory_usage()
+        if self._video is not None:
+            self._video.release_frames()
+        self._blurred_pixmap_cache.clear()
+        self._preview_pixmap_cache.clear()
+        self._preview_source = None
+        self._source_cache.clear()
+        self._release_shared_renders()
+        self._restored_keys.clear()
+        # Theme variants still being computed would otherwise land in the trimmed caches
+        self._cache_generation += 1
+        self.rendersReleased.emit()
+        released -= self.get_memory_usage()
+        logger.debug(f"Background memory trimmed, {released} bytes released")
+        
+    def get_memory_usage(self) -> int:
+        """Get the approximate number of bytes held by the background caches
+        
+        Returns:
+            int: Bytes held by cached renders and compressed copies
+        """
+        pixmaps = list(self._blurred_pixmap_cache.values()) + list(self._preview_pixmap_cache.values())
+        pixmap_bytes = sum(p.width() * p.height() * p.depth() // 8 for p in pixmaps)
+        source_bytes = sum(image.sizeInBytes() for _, _, image in self._source_cache.values())
+        video_bytes = self._video.get_memory_usage() if self._video is not None else 0
+        compact_bytes = sum(data.size() for data, _ in self._compact_cache.values())
+        return pixmap_bytes + source_bytes + video_bytes + compact_bytes
+        
+    def _compress_pixmap(self, pixmap: QPixmap) -> QByteArray:
+        """Encode a render as JPEG, or PNG when it has an alpha channel
+        
+        Args:
+            pixmap: Render to compress
+            
+        Returns:
+            QByteArray: Encoded image data or None if encoding failed
+        """
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        
+        if pixmap.hasAlphaChannel():
+            success = pixmap.save(buffer, "PNG")
+        else:
+            success = pixmap.save(buffer, "JPG", 92)
+            
+        buffer.close()
+        return data if success else None
+        
+    def _restore_compact_pixmap(self, cache_key: str) -> QPixmap:
+        """Decode the compressed copy of a trimmed render
+        
+        Args:
+            cache_key: Render cache key
+            
+        Returns:
+            QPixmap: Restored render or None if there is no usable compressed copy
+        """
+        data, device_pixel_ratio = self._compact_cache.pop(cache_key, (None, 1.0))
+        if data is None:
+            return None
+            
+        image = QImage.fromData(data)
+        if image.isNull():
+            return None
+            
+        # PNG copies decode as non-premultiplied ARGB32
+        pixmap = QPixmap.fromImage(pixel_formats.normalize(image, "compact"))
+        pixmap.setDevicePixelRatio(device_pixel_ratio)            
+        logger.debug("Background render restored from compressed copy")
+        return pixmap
+    
     def get_background_image_path(self) -> str:
         """Get current background image path
         
         Returns:
             str: Path to the background image
         """
-        if not self.config_manager:
-            return ""
-        return self.config_manager.get(self.config_manager.backgroundImagePath)
+        return self._get_setting('image_path', "")
         
     def is_background_enabled(self) -> bool:
         """Check if background image is enabled
@@ -93,9 +329,7 @@ class BackgroundManager(QObject):
         Returns:
             bool: True if background is enabled
         """
-        if not self.config_manager:
-            return False
-        return self.config_manager.get(self.config_manager.backgroundImageEnabled)
+        return self._get_setting('enabled', False)
         
     def get_background_opacity(self) -> float:
         """Get background opacity
@@ -103,9 +337,7 @@ class BackgroundManager(QObject):
         Returns:
             float: Opacity value between 0.0 and 1.0
         """
-        if not self.config_manager:
-            return 80
-        return self.config_manager.get(self.config_manager.backgroundOpacity)
+        return self._get_setting('opacity', 80)
         
     def get_background_blur_radius(self) -> int:
         """Get background blur radius
@@ -113,9 +345,7 @@ class BackgroundManager(QObject):
         Returns:
             int: Blur radius in pixels
         """
-        if not self.config_manager:
-            return 0
-        return self.config_manager.get(self.config_manager.backgroundBlurRadius)
+        return self._get_setting('blur_radius', 0)
         
     def get_background_display_mode(self) -> str:
         """Get background display mode
@@ -123,15 +353,45 @@ class BackgroundManager(QObject):
         Returns:
             str: Display mode ("Stretch", "Keep Aspect Ratio", "Tile", "Original Size", "Fit Window")
         """
-        if not self.config_manager:
-            return "Keep Aspect Ratio"
-        return self.config_manager.get(self.config_manager.backgroundDisplayMode)
+        return self._get_setting('display_mode', "Keep Aspect Ratio")
+        
+    def is_video_background(self) -> bool:
+        """Check if the background is a video file, painted through `get_video_frame`
+        
+        Returns:
+            bool: True if the current (possibly previewed) background path has a video extension
+        """
+        return Path(self.get_background_image_path()).suffix.lower() in video_background.VIDEO_FORMATS
+        
+    def _get_setting(self, name: str, default):
+        """Get a background setting: the previewed value, else the one of the route profile, else the configured one
         
-    def get_background_pixmap(self, window_size: QSize) -> QPixmap:
+        Args:
+            name: Setting name, one of BackgroundProfile.SETTINGS
+            default: Value returned when neither a profile nor the configuration provides one
+            
+        Returns:
+            Current (possibly previewed) setting value
+        """
+        if name in self._preview_overrides:
+            return self._preview_overrides[name]
+            
+        profile = self.get_profile()
+        value = profile.get(name) if profile else None
+        if value is not None:
+            return value
+            
+        if not self.config_manager or name not in self.PREVIEW_SETTINGS:
+            return default
+        return self.config_manager.get(getattr(self.config_manager, self.PREVIEW_SETTINGS[name]))
+        
+    @traced("get_background_pixmap")
+    def get_background_pixmap(self, window_size: QSize, device_pixel_ratio: float = 1.0) -> QPixmap:
         """Get processed background image (with cached blur effects)
         
         Args:
             window_size: Size of the window to fit the background
+            device_pixel_ratio: Device pixel ratio of the window, the image is rendered in device pixels
             
         Returns:
             QPixmap: Processed background pixmap or None if not available
@@ -141,39 +401,84 @@ class BackgroundManager(QObject):
                 return None
                 
             bg_path = self.get_background_image_path()
-            if not bg_path or not self.validate_image_path(bg_path):
+            if not bg_path or not self.validate_image_path(bg_path) or self.is_video_background():
                 return None
                 
             blur_radius = self.get_background_blur_radius()
             display_mode = self.get_background_display_mode()
+            variant = self.get_theme_variant()
+            crop = self._get_setting('crop', None)
             
-            # Generate cache key
-            cache_key = f"{bg_path}_{window_size.width()}_{window_size.height()}_{blur_radius}_{display_mode}"
+            # Generate cache key, theme variants of one render share the same base key
+            base_key = (f"{bg_path}_{window_size.width()}_{window_size.height()}_{device_pixel_ratio:g}_"
+                        f"{blur_radius}_{display_mode}")
+            if crop:
+                base_key = f"{base_key}_crop{'_'.join(f'{v:g}' for v in crop)}"
+            cache_key = f"{base_key}_{variant}" if variant else base_key
             
-            # Check cache
-            if cache_key in self._blurred_pixmap_cache:
-                return self._blurred_pixmap_cache[cache_key]
+            # Check cache, previews may reuse committed renders but never add to them
+            with tracer.span("cache lookup", cache="committed") as span:
+                scaled_pixmap = self._blurred_pixmap_cache.get(cache_key)
+                span.set(hit=scaled_pixmap is not None)
+            if scaled_pixmap is not None:
+                return scaled_pixmap
                 
-            # Load original image
-            pixmap = QPixmap(bg_path)
-            if pixmap.isNull():
-                return None
+            if self._previewing:
+                return self._get_preview_pixmap(base_key, variant, bg_path, window_size, blur_radius, 
+                                                display_mode, device_pixel_ratio, crop)
                 
-            # Scale image based on display mode
-            scaled_pixmap = self._process_pixmap_by_display_mode(pixmap, window_size, display_mode)
-            
-            # Apply blur effect if needed
-            if blur_radius > 0:
-                scaled_pixmap = self._apply_efficient_blur(scaled_pixmap, blur_radius)
+            # Shared and pre-rendered renders are keyed without crop, cropped profiles always render
+            shared_key = "" if crop else self._get_shared_key(bg_path, window_size, device_pixel_ratio, 
+                                                              blur_radius, display_mode, variant)
+            with tracer.span("cache lookup", cache="shared") as span:
+                scaled_pixmap = self._load_shared_pixmap(cache_key, shared_key)
+                span.set(hit=scaled_pixmap is not None)
+            is_restored = False
+            if scaled_pixmap is None:
+                with tracer.span("cache lookup", cache="compact") as span:
+                    scaled_pixmap = self._restore_compact_pixmap(cache_key)
+                    is_restored = scaled_pixmap is not None
+                    span.set(hit=is_restored)
+            if scaled_pixmap is None and not crop:
+                with tracer.span("cache lookup", cache="prerendered") as span:
+                    scaled_pixmap = self._load_prerendered_pixmap(bg_path, window_size, device_pixel_ratio, 
+                                                                  blur_radius, display_mode, variant)
+                    span.set(hit=scaled_pixmap is not None)
+            is_rendered = scaled_pixmap is None
+            if is_rendered:
+                scaled_pixmap = self._render_background_pixmap(bg_path, window_size, blur_radius, display_mode, 
+                                                               device_pixel_ratio, crop)
+                if scaled_pixmap is not None and variant:
+                    scaled_pixmap = self._apply_theme_variant(scaled_pixmap, base_key, variant, False)
+            if scaled_pixmap is None:
+                return None
+            # Restored compact copies are lossy, other instances only get full quality renders
+            if shared_key and not is_restored and cache_key not in self._shared_keys:
+                scaled_pixmap = self._publish_shared_pixmap(cache_key, shared_key, scaled_pixmap)
             
             # Cache processed image
-            self._blurred_pixmap_cache[cache_key] = scaled_pixmap
+            scaled_pixmap = self._cache_render(self._blurred_pixmap_cache, cache_key, scaled_pixmap, 
+                                               self._get_cache_limit())
             self._current_blur_key = cache_key
             
-            # Clean old cache (keep recent 5 entries)
-            if len(self._blurred_pixmap_cache) > 5:
-                oldest_key = next(iter(self._blurred_pixmap_cache))
-                del self._blurred_pixmap_cache[oldest_key]
+            variants = []
+            if is_restored:
+                # Shown until a worker has rendered it again at full quality
+                self._restored_keys[cache_key] = shared_key
+                variants.append(variant)
+            if variant and not is_rendered:
+                # Cached renders come without the other theme variants, a theme switch must only swap renders
+                variants += self._load_shared_variants(base_key, variant, bg_path, window_size, device_pixel_ratio, 
+                                                       blur_radius, display_mode, crop)
+            if variants:
+                render_args = (bg_path, QSize(window_size), blur_radius, display_mode, device_pixel_ratio, crop)
+                QThreadPool.globalInstance().start(RenderTask(self._cache_generation, base_key, render_args, 
+                                                              variants, self._render_signals))
+            
+            # The window size or settings changed, the neighbouring routes need new renders too
+            if not self._prerendering:
+                self._last_request = (QSize(window_size), device_pixel_ratio)
+                self._schedule_neighbour_prerender()
                 
             return scaled_pixmap
             
@@ -181,91 +486,865 @@ class BackgroundManager(QObject):
             logger.error(f"Failed to get background pixmap: {str(e)}")
             return None
             
-    def _process_pixmap_by_display_mode(self, pixmap: QPixmap, window_size: QSize, display_mode: str) -> QPixmap:
-        """Process pixmap according to display mode
+    def _cache_render(self, cache: dict, cache_key: str, pixmap: QPixmap, limit: int) -> QPixmap:
+        """Add a render to a cache, dropping the oldest entries beyond the limit
+        
+        Returns:
+            QPixmap: Cached render, converted to a native format if it was not in one
+        """
+        pixmap = pixel_formats.normalize_pixmap(pixmap, "render")
+        cache[cache_key] = pixmap
+        while len(cache) > limit:
+            oldest_key = next(iter(cache))
+            del cache[oldest_key]
+            if cache is self._blurred_pixmap_cache:
+                self._release_shared_render(oldest_key)
+                
+        return pixmap
+            
+    def _get_cache_limit(self) -> int:
+        """Get the number of committed renders kept: the usual limit plus one render and its theme
+        variants for each neighbouring route"""
+        return self.CACHE_LIMIT + len(self._neighbour_routes) * (1 + len(self.THEME_VARIANTS))
+        
+    def set_profile(self, name: str, profile: BackgroundProfile):
+        """Add or replace a named background profile
+        
+        Args:
+            name: Profile name
+            profile: Settings of the profile, or None to remove it
+        """
+        if profile is None:
+            self._profiles.pop(name, None)
+        else:
+            self._profiles[name] = profile
+            
+        if self._route_profiles.get(self._current_route) == name:
+            self.backgroundChanged.emit()
+        self._schedule_neighbour_prerender()
+        
+    def attach_profile(self, route_key: str, name: str):
+        """Show the background of a profile on the page of a route
+        
+        Args:
+            route_key: Route key of the page, i.e. the object name of the sub interface
+            name: Profile name, or None to show the configured background
+        """
+        if name is None:
+            self._route_profiles.pop(route_key, None)
+        else:
+            self._route_profiles[route_key] = name
+            
+        if route_key == self._current_route:
+            self.backgroundChanged.emit()
+        self._schedule_neighbour_prerender()
+        
+    def get_profile(self, route_key: str = None) -> BackgroundProfile:
+        """Get the profile attached to a route
+        
+        Args:
+            route_key: Route key, None for the current route
+            
+        Returns:
+            BackgroundProfile: Attached profile or None if the route shows the configured background
+        """
+        if route_key is None:
+            route_key = self._current_route
+        return self._profiles.get(self._route_profiles.get(route_key))
+        
+    def get_current_route(self) -> str:
+        """Get the route whose background is rendered"""
+        return self._current_route
+        
+    def set_route(self, route_key: str, neighbours=()):
+        """Switch the background to the profile of a route
+        
+        The backgrounds of the neighbouring routes are rendered in idle time afterwards, so the
+        next navigation finds them in the cache.
+        
+        Args:
+            route_key: Route key of the page now shown
+            neighbours: Route keys the user is likely to navigate to next
+        """
+        self._current_route = route_key
+        self._neighbour_routes = [route for route in neighbours if route != route_key]
+        self._schedule_neighbour_prerender()
+        
+    def _schedule_neighbour_prerender(self):
+        """Queue the neighbouring routes, rendered once no render happened for PRERENDER_DELAY"""
+        self._prerender_queue = list(self._neighbour_routes)
+        if self._prerender_queue and self._last_request:
+            self._prerender_timer.start()
+            
+    def _prerender_next_route(self):
+        """Render the background of the next queued route into the committed cache"""
+        if not self._prerender_queue or not self._last_request:
+            return
+            
+        # Previews render the previewed state, try again once it is committed or rolled back
+        if self._previewing:
+            self._prerender_timer.start()
+            return
+            
+        route = self._prerender_queue.pop(0)
+        current_route, current_key = self._current_route, self._current_blur_key
+        self._current_route = route
+        self._prerendering = True
+        try:
+            with tracer.span("prerender route", route=route):
+                self.get_background_pixmap(*self._last_request)
+        finally:
+            self._current_route, self._current_blur_key = current_route, current_key
+            self._prerendering = False
+            
+        # One route per event loop iteration keeps the window responsive
+        if self._prerender_queue:
+            self._prerender_timer.start(0)
+            
+    def set_shared_cache_enabled(self, enabled: bool):
+        """Enable or disable sharing committed renders with other instances through shared memory
+        
+        The first instance rendering a background publishes its pixels, the others map them
+        read-only instead of decoding and blurring the same image again.
+        
+        Args:
+            enabled: Whether renders are shared
+        """
+        if enabled == (self._shared_cache is not None):
+            return
+            
+        # Renders backed by shared memory must go before their segments are detached
+        for cache_key in self._shared_keys:
+            self._blurred_pixmap_cache.pop(cache_key, None)
+        self._release_shared_renders()
+        self.rendersReleased.emit()
+        self._shared_cache = SharedRenderCache(self._render_cache) if enabled else None
+        
+    def _get_shared_key(self, bg_path: str, window_size: QSize, device_pixel_ratio: float, 
+                        blur_radius: int, display_mode: str, variant: str) -> str:
+        """Get the shared memory key of a committed render, or an empty string if sharing is disabled"""
+        if self._shared_cache is None:
+            return ""
+            
+        return self._shared_cache.make_key(bg_path, window_size.width(), window_size.height(), 
+                                           device_pixel_ratio, blur_radius, display_mode, variant)
+        
+    def _load_shared_pixmap(self, cache_key: str, shared_key: str) -> QPixmap:
+        """Map a render published by another instance
+        
+        Returns:
+            QPixmap: Pixmap backed by shared memory or None if the render is not shared
+        """
+        if not shared_key:
+            return None
+            
+        image = self._shared_cache.load(shared_key)
+        if image.isNull():
+            return None
+            
+        self._shared_keys[cache_key] = shared_key
+        logger.debug(f"Background mapped from shared memory: {shared_key}")
+        return QPixmap.fromImage(image)
+        
+    def _publish_shared_pixmap(self, cache_key: str, shared_key: str, pixmap: QPixmap) -> QPixmap:
+        """Publish a render to other instances, returning a pixmap backed by the shared copy
+        
+        Returns:
+            QPixmap: Pixmap backed by shared memory, or the given pixmap if publishing failed
+        """
+        image = self._shared_cache.publish(shared_key, pixmap.toImage())
+        if image.isNull():
+            return pixmap
+            
+        self._shared_keys[cache_key] = shared_key
+        return QPixmap.fromImage(image)
+        
+    def _release_shared_render(self, cache_key: str):
+        """Detach the segment of a render dropped from the committed cache"""
+        shared_key = self._shared_keys.pop(cache_key, None)
+        if shared_key and shared_key not in self._shared_keys.values():
+            self._shared_cache.release(shared_key)
+            self.rendersReleased.emit()
+            
+    def _release_shared_renders(self):
+        """Detach all segments, the renders backed by them must already be dropped"""
+        self._shared_keys.clear()
+        if self._shared_cache is not None:
+            self._shared_cache.clear()
+            
+    def get_video_frame(self, window_size: QSize, device_pixel_ratio: float = 1.0) -> QImage:
+        """Get the current frame of a video background, starting playback if needed
+        
+        Frames are composed for the current display mode and blur radius into a reusable frame
+        ring; theme variants and crops only apply to still images.
+        
+        Args:
+            window_size: Size of the window to fit the video
+            device_pixel_ratio: Device pixel ratio of the window
+            
+        Returns:
+            QImage: Frame in Format_RGB32, only valid until the next frame, or a null image before the first one
+        """
+        bg_path = self.get_background_image_path()
+        if not self.is_background_enabled() or not self.is_video_background() or not self.validate_image_path(bg_path):
+            self.stop_video()
+            return QImage()
+            
+        if self._video is None:
+            self._video = video_background.VideoBackground(self)
+            self._video.set_frame_rate(self._video_frame_rate)
+            self._video.frameReady.connect(self.videoFrameReady)
+            
+        self._video.set_layout(window_size, device_pixel_ratio, self.get_background_display_mode(), 
+                               self.get_background_blur_radius())
+        self._video.set_source(bg_path)
+        return self._video.current_frame()
+        
+    def stop_video(self):
+        """Stop a playing video background and free its frames"""
+        if self._video is not None and self._video.get_source():
+            self._video.stop()
+            
+    def set_video_paused(self, paused: bool):
+        """Pause or resume the video background, e.g. while the window is hidden or minimized
+        
+        Args:
+            paused: Whether playback is paused
+        """
+        if self._video is not None:
+            self._video.set_paused(paused)
+            
+    def set_video_frame_rate(self, frame_rate: int):
+        """Set the number of video background frames shown per second at most
+        
+        Args:
+            frame_rate: Frame rate cap
+        """
+        self._video_frame_rate = frame_rate
+        if self._video is not None:
+            self._video.set_frame_rate(frame_rate)
+            
+    def report_video_paint_time(self, seconds: float):
+        """Report how long painting the current video frame took, slow paints make playback drop frames
+        
+        Args:
+            seconds: Duration of the paint event
+        """
+        if self._video is not None:
+            self._video.report_paint_time(seconds)
+            
+    def get_video_stats(self) -> dict:
+        """Get playback statistics of the video background
+        
+        Returns:
+            dict: See VideoBackground.get_stats, empty if no video was played
+        """
+        return self._video.get_stats() if self._video is not None else {}
+        
+    def get_theme_variant(self) -> str:
+        """Get the theme variant of the background for the current theme
+        
+        Returns:
+            str: "light" or "dark", or None if theme adaptation is disabled
+        """
+        if not self._get_setting('theme_adaptive', False):
+            return None
+        return "dark" if isDarkTheme() else "light"
+        
+    @classmethod
+    def create_theme_variant(cls, image: QImage, variant: str) -> QImage:
+        """Create the light or dark variant of a rendered background
+        
+        Only QImage is used, so this is safe to call from worker threads.
+        
+        Args:
+            image: Theme neutral render
+            variant: Key of THEME_VARIANTS
+            
+        Returns:
+            QImage: Adjusted copy of the image
+        """
+        overlay, tint = cls.THEME_VARIANTS[variant]
+        # Opaque renders stay RGB32, the neutral render itself must never be painted on
+        result = pixel_formats.normalize(image, "theme variant")
+        if result is image:
+            result = image.copy()
+        
+        painter = QPainter(result)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceAtop)
+        painter.fillRect(result.rect(), overlay)
+        painter.setCompositionMode(QPainter.CompositionMode_SoftLight)
+        painter.fillRect(result.rect(), tint)
+        painter.end()
+        
+        return result
+        
+    def _apply_theme_variant(self, pixmap: QPixmap, base_key: str, variant: str, preview: bool) -> QPixmap:
+        """Apply the current theme variant and precompute the other ones on a worker thread
+        
+        Args:
+            pixmap: Theme neutral render
+            base_key: Render cache key without the variant suffix
+            variant: Variant needed right now
+            preview: Whether the render belongs to the preview cache
+            
+        Returns:
+            QPixmap: Render of the requested variant
+        """
+        image = pixmap.toImage()
+        
+        for other_variant in self.THEME_VARIANTS:
+            if other_variant != variant:
+                # Each worker gets its own image object, one QImage must not be shared across threads
+                task = ThemeVariantTask(self._cache_generation, f"{base_key}_{other_variant}", preview, 
+                                        QImage(image), other_variant, self._variant_signals)
+                QThreadPool.globalInstance().start(task)
+                
+        return QPixmap.fromImage(self.create_theme_variant(image, variant))
+        
+    def _load_shared_variants(self, base_key: str, variant: str, bg_path: str, window_size: QSize, 
+                              device_pixel_ratio: float, blur_radius: int, display_mode: str, crop: tuple) -> list:
+        """Map the other theme variants of a cached render from shared memory where they are published
+        
+        Args:
+            base_key: Render cache key without the variant suffix
+            variant: Variant already cached
+            
+        Returns:
+            list: Variants neither cached nor shared, to be rendered on a worker thread
+        """
+        missing = []
+        for other_variant in self.THEME_VARIANTS:
+            other_key = f"{base_key}_{other_variant}"
+            if other_variant == variant or other_key in self._blurred_pixmap_cache:
+                continue
+                
+            shared_key = "" if crop else self._get_shared_key(bg_path, window_size, device_pixel_ratio, 
+                                                              blur_radius, display_mode, other_variant)
+            pixmap = self._load_shared_pixmap(other_key, shared_key)
+            if pixmap is None:
+                missing.append(other_variant)
+            else:
+                self._cache_render(self._blurred_pixmap_cache, other_key, pixmap, self._get_cache_limit())
+                
+        return missing
+        
+    def _on_theme_variant_ready(self, generation: int, cache_key: str, preview: bool, image: QImage):
+        """Store a theme variant precomputed by a worker thread"""
+        if generation != self._cache_generation:
+            return
+            
+        if preview:
+            self._cache_render(self._preview_pixmap_cache, cache_key, QPixmap.fromImage(image), 
+                               self.PREVIEW_CACHE_LIMIT)
+        elif cache_key not in self._blurred_pixmap_cache:
+            self._cache_render(self._blurred_pixmap_cache, cache_key, QPixmap.fromImage(image), 
+                               self._get_cache_limit())
+            
+    def _on_render_ready(self, generation: int, cache_key: str, image: QImage):
+        """Store a render made by a worker thread, replacing the lossy restored render of the same key"""
+        if generation != self._cache_generation:
+            return
+            
+        pixmap = QPixmap.fromImage(image)
+        if cache_key in self._restored_keys:
+            shared_key = self._restored_keys.pop(cache_key)
+            if cache_key not in self._blurred_pixmap_cache:
+                return
+            if shared_key and cache_key not in self._shared_keys:
+                pixmap = self._publish_shared_pixmap(cache_key, shared_key, pixmap)
+            self._cache_render(self._blurred_pixmap_cache, cache_key, pixmap, self._get_cache_limit())
+            if cache_key == self._current_blur_key:
+                self.backgroundChanged.emit()
+            logger.debug("Background render restored from compressed copy refined")
+        elif cache_key not in self._blurred_pixmap_cache:
+            self._cache_render(self._blurred_pixmap_cache, cache_key, pixmap, self._get_cache_limit())
+            
+    def _on_theme_changed(self):
+        if self.get_theme_variant():
+            self.backgroundChanged.emit()
+            
+    def render_background(self, bg_path: str, window_size: QSize, blur_radius: int, display_mode: str, 
+                          device_pixel_ratio: float = 1.0, variant: str = None, crop: tuple = None) -> QPixmap:
+        """Render a background image without touching any cache
+        
+        This is the pipeline used by `get_background_pixmap`, exposed for offscreen pre-rendering.
+        
+        Args:
+            bg_path: Path to the image file
+            window_size: Size of the window to fit the background
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            device_pixel_ratio: Device pixel ratio of the window
+            variant: Key of THEME_VARIANTS or None for the theme neutral render
+            crop: Part of the image to show, see BackgroundProfile.normalize_crop
+            
+        Returns:
+            QPixmap: Processed pixmap or None if the image cannot be loaded
+        """
+        pixmap = self._render_background_pixmap(bg_path, window_size, blur_radius, display_mode, 
+                                                device_pixel_ratio, BackgroundProfile.normalize_crop(crop))
+        if pixmap is None or not variant:
+            return pixmap
+        return QPixmap.fromImage(self.create_theme_variant(pixmap.toImage(), variant))
+        
+    def _render_background_pixmap(self, bg_path: str, window_size: QSize, blur_radius: int, 
+                                  display_mode: str, device_pixel_ratio: float = 1.0, crop: tuple = None) -> QPixmap:
+        """Render a background image at full resolution, reusing cached decodes of its source
+        
+        Args:
+            bg_path: Path to the image file
+            window_size: Size of the window to fit the background
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            device_pixel_ratio: Device pixel ratio of the window
+            crop: Normalized crop rectangle or None
+            
+        Returns:
+            QPixmap: Processed pixmap or None if the image cannot be loaded
+        """
+        image = self.render_image(bg_path, window_size, blur_radius, display_mode, device_pixel_ratio, crop, 
+                                  self._decode_source)
+        return QPixmap.fromImage(image) if not image.isNull() else None
+        
+    @classmethod
+    @traced("render")
+    def render_image(cls, bg_path: str, window_size: QSize, blur_radius: int, display_mode: str, 
+                     device_pixel_ratio: float = 1.0, crop: tuple = None, decode=decode_image) -> QImage:
+        """Decode, crop, scale and blur a background image at full resolution
+        
+        Only QImage is used, so this is safe to call from worker threads with the default decoder.
+        
+        Args:
+            bg_path: Path to the image file
+            window_size: Size of the window to fit the background
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            device_pixel_ratio: Device pixel ratio of the window
+            crop: Normalized crop rectangle or None
+            decode: Called with the path and the size to cover (None for full size) to get the source
+            
+        Returns:
+            QImage: Processed image or a null image if the image cannot be loaded
+        """
+        # Images fitted to the window are rendered in device pixels, unscaled ones keep their pixels
+        if display_mode in ("Original Size", "Tile"):
+            device_pixel_ratio = 1.0
+        target_size = QSize(round(window_size.width() * device_pixel_ratio), 
+                            round(window_size.height() * device_pixel_ratio))
+        
+        # Load original image, decoded only as large as the display mode needs
+        is_unscaled = display_mode in ("Original Size", "Tile")
+        image = decode(bg_path, None if is_unscaled else cls._get_crop_source_size(target_size, crop))
+        if image.isNull():
+            return image
+        image = cls._crop_image(image, crop)
+            
+        # Scale image based on display mode
+        image = cls._process_image_by_display_mode(image, target_size, display_mode)
+        image = pixel_formats.normalize(image, "scale")
+        
+        # Apply blur effect if needed
+        if blur_radius > 0:
+            image = cls._apply_efficient_blur(image, round(blur_radius * device_pixel_ratio))
+            image = pixel_formats.normalize(image, "blur")
+            
+        image.setDevicePixelRatio(device_pixel_ratio)
+        return image
+        
+    @staticmethod
+    def _get_crop_source_size(target_size: QSize, crop: tuple) -> QSize:
+        """Get the size the whole image must cover so that its cropped part covers target_size"""
+        if not crop:
+            return target_size
+        return QSize(math.ceil(target_size.width() / crop[2]), math.ceil(target_size.height() / crop[3]))
+        
+    @staticmethod
+    def _crop_image(image: QImage, crop: tuple) -> QImage:
+        """Get the part of an image selected by a normalized crop rectangle"""
+        if not crop:
+            return image
+        x, y, width, height = crop
+        return image.copy(QRect(round(x * image.width()), round(y * image.height()), 
+                                max(1, round(width * image.width())), max(1, round(height * image.height()))))
+        
+    def _decode_source(self, bg_path: str, target_size: QSize = None) -> QImage:
+        """Get the decoded source image, upright and in sRGB, reusing a cached decode when large enough
+        
+        Args:
+            bg_path: Path to the image file
+            target_size: Size the image will be fitted to by expanding, None for the full size image
+            
+        Returns:
+            QImage: Decoded source, null if the image cannot be decoded
+        """
+        try:
+            modified_time = os.path.getmtime(bg_path)
+        except OSError:
+            return QImage()
+            
+        with tracer.span("cache lookup", cache="source") as span:
+            image = self._get_cached_source(bg_path, modified_time, target_size)
+            span.set(hit=image is not None)
+        if image is not None:
+            return image
+            
+        image = decode_image(bg_path, target_size)
+        if image.isNull():
+            return image
+            
+        # A decode the plugin did not shrink is the full size image and serves every target size
+        is_full_size = target_size is None or image.size() == get_image_size(bg_path)
+        self._source_cache.pop(bg_path, None)
+        self._source_cache[bg_path] = (modified_time, is_full_size, image)
+        # Profiles sharing a source share its decode, keep one per profile image
+        profile_sources = {profile.image_path for profile in self._profiles.values() if profile.image_path}
+        while len(self._source_cache) > max(self.SOURCE_CACHE_LIMIT, len(profile_sources) + 1):
+            del self._source_cache[next(iter(self._source_cache))]
+            
+        return image
+        
+    def _get_cached_source(self, bg_path: str, modified_time: float, target_size: QSize) -> QImage:
+        """Get the cached decode of a source if it is current and large enough, otherwise None"""
+        cached = self._source_cache.get(bg_path)
+        if not cached or cached[0] != modified_time:
+            return None
+            
+        _, is_full_size, image = cached
+        if is_full_size:
+            return image
+        if target_size is not None:
+            needed = image.size().scaled(target_size, Qt.KeepAspectRatioByExpanding)
+            if image.width() >= needed.width() and image.height() >= needed.height():
+                return image
+        return None
+        
+    def _load_prerendered_pixmap(self, bg_path: str, window_size: QSize, device_pixel_ratio: float, 
+                                 blur_radius: int, display_mode: str, variant: str) -> QPixmap:
+        """Load a render written by the batch pre-renderer
+        
+        Args:
+            bg_path: Path to the image file
+            window_size: Size of the window to fit the background
+            device_pixel_ratio: Device pixel ratio of the window
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            variant: Key of THEME_VARIANTS or None
+            
+        Returns:
+            QPixmap: Pre-rendered pixmap or None if there is none
+        """
+        if not self._render_cache:
+            return None
+            
+        args = (bg_path, window_size.width(), window_size.height(), device_pixel_ratio, blur_radius, display_mode)
+        image = self._render_cache.load(*args, variant)
+        if image.isNull() and variant:
+            # Fall back to the theme neutral render and derive the variant from it
+            image = self._render_cache.load(*args)
+            if not image.isNull():
+                image = self.create_theme_variant(image, variant)
+                
+        if image.isNull():
+            return None
+            
+        # Renders with alpha are stored as non-premultiplied PNG
+        image = pixel_formats.normalize(image, "prerendered")
+        if display_mode not in ("Original Size", "Tile"):
+            image.setDevicePixelRatio(device_pixel_ratio)
+            
+        logger.debug(f"Background loaded from pre-rendered cache: {bg_path}")
+        return QPixmap.fromImage(image)
+            
+    def begin_preview(self, low_resolution: bool = False, **overrides):
+        """Begin a preview transaction, or update the one in progress
+        
+        Previewed values are returned by the getters and rendered through the normal pipeline,
+        but they are neither saved to the configuration nor added to the committed render cache
+        until `commit_preview` is called.
         
         Args:
-            pixmap: Original pixmap
+            low_resolution: Render the preview at 1/PREVIEW_SCALE resolution (e.g. while hovering)
+            **overrides: Settings to preview, keys of PREVIEW_SETTINGS
+                ("enabled", "image_path", "opacity", "blur_radius", "display_mode", "theme_adaptive")
+        """
+        unknown = set(overrides) - set(self.PREVIEW_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown background preview settings: {', '.join(sorted(unknown))}")
+            
+        changed = (not self._previewing or low_resolution != self._preview_low_resolution or 
+                   any(k not in self._preview_overrides or self._preview_overrides[k] != v 
+                       for k, v in overrides.items()))
+        
+        self._previewing = True
+        self._preview_low_resolution = low_resolution
+        self._preview_overrides.update(overrides)
+        
+        if changed:
+            self.backgroundChanged.emit()
+            
+    def commit_preview(self):
+        """Save the previewed settings to the configuration and end the preview
+        
+        The full-resolution render of the previewed state is moved to the committed cache,
+        so the committed background is shown without rendering it again.
+        """
+        if not self._previewing:
+            return
+            
+        overrides = self._preview_overrides
+        promoted_key = self._current_preview_key
+        variant = self.get_theme_variant()
+        
+        self._end_preview()
+        
+        if promoted_key:
+            # Promote the render together with its precomputed theme variants
+            for key in [promoted_key] + [f"{promoted_key}_{v}" for v in self.THEME_VARIANTS]:
+                if key in self._preview_pixmap_cache:
+                    self._cache_render(self._blurred_pixmap_cache, key, self._preview_pixmap_cache.pop(key), 
+                                       self._get_cache_limit())
+            self._current_blur_key = f"{promoted_key}_{variant}" if variant else promoted_key
+                
+        if self.config_manager:
+            for name, value in overrides.items():
+                self.config_manager.set(getattr(self.config_manager, self.PREVIEW_SETTINGS[name]), value)
+                
+        self.backgroundChanged.emit()
+        logger.debug(f"Background preview committed: {overrides}")
+        
+    def rollback_preview(self):
+        """Discard the previewed settings and show the committed background again
+        
+        The committed render cache is left untouched, so cancelling does not render anything.
+        """
+        if not self._previewing:
+            return
+            
+        self._end_preview()
+        self.backgroundChanged.emit()
+        
+    def is_previewing(self) -> bool:
+        """Check if a preview transaction is in progress
+        
+        Returns:
+            bool: True if previewed settings replace the configured ones
+        """
+        return self._previewing
+        
+    def _end_preview(self):
+        self._previewing = False
+        self._preview_low_resolution = False
+        self._preview_overrides = {}
+        self._current_preview_key = None
+        self._preview_source = None
+        
+    def _get_preview_pixmap(self, base_key: str, variant: str, bg_path: str, window_size: QSize, 
+                            blur_radius: int, display_mode: str, device_pixel_ratio: float, 
+                            crop: tuple = None) -> QPixmap:
+        """Get rendered preview image from the preview cache
+        
+        Args:
+            base_key: Render cache key of the previewed state, without theme variant
+            variant: Theme variant to render or None
+            bg_path: Path to the image file to preview
+            window_size: Size of the window to fit the background
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            device_pixel_ratio: Device pixel ratio of the window
+            crop: Normalized crop rectangle or None
+            
+        Returns:
+            QPixmap: Preview pixmap or None if the image cannot be decoded
+        """
+        cache_key = f"{base_key}_{variant}" if variant else base_key
+        if self._preview_low_resolution:
+            cache_key = f"{cache_key}_low"
+        else:
+            self._current_preview_key = base_key
+            
+        if cache_key in self._preview_pixmap_cache:
+            return self._preview_pixmap_cache[cache_key]
+            
+        if self._preview_low_resolution:
+            pixmap = self._render_low_resolution_pixmap(bg_path, window_size, blur_radius, display_mode, crop)
+            if pixmap is not None and variant:
+                pixmap = QPixmap.fromImage(self.create_theme_variant(pixmap.toImage(), variant))
+        else:
+            pixmap = self._render_background_pixmap(bg_path, window_size, blur_radius, display_mode, 
+                                                    device_pixel_ratio, crop)
+            if pixmap is not None and variant:
+                pixmap = self._apply_theme_variant(pixmap, base_key, variant, True)
+            
+        if pixmap is None:
+            return None
+            
+        return self._cache_render(self._preview_pixmap_cache, cache_key, pixmap, self.PREVIEW_CACHE_LIMIT)
+        
+    @traced("render low resolution")
+    def _render_low_resolution_pixmap(self, bg_path: str, window_size: QSize, blur_radius: int, 
+                                      display_mode: str, crop: tuple = None) -> QPixmap:
+        """Render a background image at 1/PREVIEW_SCALE resolution and scale it back up
+        
+        Args:
+            bg_path: Path to the image file
+            window_size: Size of the window to fit the background
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            crop: Normalized crop rectangle or None
+            
+        Returns:
+            QPixmap: Low-resolution render or None if the image cannot be decoded
+        """
+        scale = self.PREVIEW_SCALE
+        low_res_size = QSize(max(1, window_size.width() // scale), max(1, window_size.height() // scale))
+        
+        try:
+            modified_time = os.path.getmtime(bg_path)
+        except OSError:
+            return None
+            
+        # Slider steps only change the blur, scale the source down once per preview
+        source_key = (bg_path, modified_time, low_res_size.width(), low_res_size.height(), display_mode, crop)
+        if self._preview_source and self._preview_source[0] == source_key:
+            image = self._preview_source[1]
+        else:
+            # Decode directly at reduced size instead of decoding full resolution and scaling down
+            if display_mode in ("Original Size", "Tile"):
+                source_size = get_image_size(bg_path)
+                decode_size = QSize(max(1, source_size.width() // scale), max(1, source_size.height() // scale))
+            else:
+                decode_size = self._get_crop_source_size(low_res_size, crop)
+                
+            # Reuse the decode of the committed render when there is one
+            image = self._get_cached_source(bg_path, modified_time, decode_size)
+            if image is None:
+                image = decode_image(bg_path, decode_size)
+            elif image.size() != decode_size and display_mode in ("Original Size", "Tile"):
+                image = image.scaled(decode_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+            if image.isNull():
+                return None
+                
+            image = self._process_image_by_display_mode(self._crop_image(image, crop), low_res_size, display_mode)
+            self._preview_source = (source_key, image)
+            
+        if blur_radius > 0:
+            image = self._apply_efficient_blur(image, max(1, blur_radius // scale))
+            
+        return QPixmap.fromImage(image.scaled(
+            image.width() * scale, 
+            image.height() * scale, 
+            Qt.IgnoreAspectRatio, 
+            Qt.SmoothTransformation
+        ))
+            
+    @staticmethod
+    @traced("scale")
+    def _process_image_by_display_mode(image: QImage, window_size: QSize, display_mode: str) -> QImage:
+        """Process image according to display mode
+        
+        Args:
+            image: Original image
             window_size: Target window size
             display_mode: Display mode string
             
         Returns:
-            QPixmap: Processed pixmap
+            QImage: Processed image
         """
         try:
             if display_mode == "Stretch":
                 # Stretch to fill window, may distort image
-                return pixmap.scaled(window_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+                return image.scaled(window_size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
                 
             elif display_mode == "Keep Aspect Ratio":
                 # Keep aspect ratio, expand to fill (current default behavior)
-                return pixmap.scaled(window_size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+                return image.scaled(window_size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
                 
             elif display_mode == "Fit Window":
                 # Keep aspect ratio, fit within window
-                return pixmap.scaled(window_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                return image.scaled(window_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
                 
             elif display_mode == "Original Size":
                 # Keep original size, no scaling
-                return pixmap
+                return image
                 
             elif display_mode == "Tile":
                 # For tile mode, we need to create a pixmap that covers the window
                 # This will be handled specially in the paint event
-                return pixmap
+                return image
                 
             else:
                 # Default fallback
-                return pixmap.scaled(window_size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+                return image.scaled(window_size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
                 
         except Exception as e:
-            logger.error(f"Failed to process pixmap by display mode {display_mode}: {str(e)}")
-            return pixmap
+            logger.error(f"Failed to process image by display mode {display_mode}: {str(e)}")
+            return image
             
-    def _apply_efficient_blur(self, pixmap: QPixmap, blur_radius: int) -> QPixmap:
+    @classmethod
+    @traced("blur")
+    def _apply_efficient_blur(cls, image: QImage, blur_radius: int) -> QImage:
         """Apply efficient blur effect (simplified Gaussian blur)
         
         Args:
-            pixmap: Source pixmap to blur
+            image: Source image to blur
             blur_radius: Blur radius in pixels
             
         Returns:
-            QPixmap: Blurred pixmap
+            QImage: Blurred image
         """
         try:
-            # For performance, use simplified blur algorithm
-            # For large blur radius, scale down first then scale up to improve performance
-            original_size = pixmap.size()
-            
-            if blur_radius > 20:
-                # For high blur radius, scale down to 1/4 for processing
-                small_size = QSize(int(original_size.width() * 0.25), int(original_size.height() * 0.25))
-                temp_pixmap = pixmap.scaled(small_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                blurred = self._simple_blur(temp_pixmap, blur_radius // 4)
-                return blurred.scaled(original_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            else:
-                return self._simple_blur(pixmap, blur_radius)
+            # With NumPy, large radii use the Gaussian, which reduces the image itself
+            if tiled_blur.is_used_for(blur_radius):
+                return tiled_blur.blur_image_reduced(image, blur_radius)
+                
+            return cls._scaled_blur(image, blur_radius)
                 
         except Exception as e:
             logger.error(f"Failed to apply blur effect: {str(e)}")
-            return pixmap
+            return image
+            
+    @classmethod
+    def _scaled_blur(cls, image: QImage, blur_radius: int) -> QImage:
+        """Blur with the Qt scale-down blur, used without NumPy and for small radii
+        
+        Args:
+            image: Source image to blur
+            blur_radius: Blur radius in pixels
             
-    def _simple_blur(self, pixmap: QPixmap, radius: int) -> QPixmap:
+        Returns:
+            QImage: Blurred image
+        """
+        # For performance, use simplified blur algorithm
+        # For large blur radius, scale down first then scale up to improve performance
+        original_size = image.size()
+        
+        if blur_radius > 20:
+            # For high blur radius, scale down to 1/4 for processing
+            small_size = QSize(int(original_size.width() * 0.25), int(original_size.height() * 0.25))
+            temp_image = image.scaled(small_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            blurred = cls._simple_blur(temp_image, blur_radius // 4)
+            return blurred.scaled(original_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        else:
+            return cls._simple_blur(image, blur_radius)
+            
+    @staticmethod
+    def _simple_blur(image: QImage, radius: int) -> QImage:
         """Simple blur implementation without position offset (avoiding QGraphicsBlurEffect for performance)
         
         Args:
-            pixmap: Source pixmap
+            image: Source image
             radius: Blur radius
             
         Returns:
-            QPixmap: Blurred pixmap
+            QImage: Blurred image
         """
         try:
             if radius <= 0:
-                return pixmap
+                return image
                 
             # Use scale-down and scale-up method for blur effect without position offset
-            original_size = pixmap.size()
+            original_size = image.size()
             
             # Calculate blur factor based on radius (more radius = more blur)
             blur_factor = max(0.1, 1.0 - (radius / 100.0))  # blur_factor decreases as radius increases
@@ -277,14 +1356,14 @@ class BackgroundManager(QObject):
             )
             
             # Scale down with smooth transformation
-            small_pixmap = pixmap.scaled(
+            small_image = image.scaled(
                 blurred_size, 
                 Qt.KeepAspectRatio, 
                 Qt.SmoothTransformation
             )
             
             # Scale back up to original size for blur effect
-            blurred_pixmap = small_pixmap.scaled(
+            blurred_image = small_image.scaled(
                 original_size, 
                 Qt.KeepAspectRatio, 
                 Qt.SmoothTransformation
@@ -292,7 +1371,8 @@ class BackgroundManager(QObject):
             
             # Optional: Apply additional opacity overlay for stronger blur effect
             if radius > 25:
-                result = QPixmap(original_size)
+                # Painted straight into the premultiplied format
+                result = QImage(original_size, QImage.Format_ARGB32_Premultiplied)
                 result.fill(Qt.transparent)
                 
                 painter = QPainter(result)
@@ -300,20 +1380,20 @@ class BackgroundManager(QObject):
                 
                 # Draw the blurred image as base
                 painter.setOpacity(0.8)
-                painter.drawPixmap(0, 0, blurred_pixmap)
+                painter.drawImage(0, 0, blurred_image)
                 
                 # Overlay with additional transparency for stronger blur
                 painter.setOpacity(0.3)
-                painter.drawPixmap(0, 0, blurred_pixmap)
+                painter.drawImage(0, 0, blurred_image)
                 
                 painter.end()
                 return result
             
-            return blurred_pixmap
+            return blurred_image
             
         except Exception as e:
             logger.error(f"Simple blur processing failed: {str(e)}")
-            return pixmap
+            return image
     
     def update_background(self):
         """Update background settings, clear cache and emit signal"""
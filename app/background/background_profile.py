@@ -0,0 +1,71 @@
+# coding: utf-8
+"""
+Background Profile - Named background settings attached to navigation routes
+"""
+
+from PyQt5.QtCore import QRectF
+
+
+class BackgroundProfile:
+    """Background profile - Background settings of one or more pages
+
+    Settings left to None follow the application configuration, so a profile only has to name
+    what makes its pages different, e.g. another image or a stronger blur.
+    """
+
+    # Settings a profile can override, named like the keys of BackgroundManager.PREVIEW_SETTINGS
+    SETTINGS = ('enabled', 'image_path', 'opacity', 'blur_radius', 'display_mode', 'theme_adaptive', 'crop')
+
+    def __init__(self, image_path: str = None, opacity: int = None, blur_radius: int = None,
+                 display_mode: str = None, theme_adaptive: bool = None, enabled: bool = None, crop=None):
+        """
+        Args:
+            image_path: Background image of the profile
+            opacity: Opacity in percent
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            theme_adaptive: Whether light and dark theme variants are used
+            enabled: Whether the background is shown at all
+            crop: Part of the image to show as (x, y, width, height) fractions of the image size,
+                or a QRectF in the same unit
+        """
+        self.image_path = image_path
+        self.opacity = opacity
+        self.blur_radius = blur_radius
+        self.display_mode = display_mode
+        self.theme_adaptive = theme_adaptive
+        self.enabled = enabled
+        self.crop = self.normalize_crop(crop)
+
+    @staticmethod
+    def normalize_crop(crop) -> tuple:
+        """Get a crop rectangle as an (x, y, width, height) tuple clamped to the image
+
+        Args:
+            crop: Tuple or QRectF in fractions of the image size, or None
+
+        Returns:
+            tuple: Normalized crop, or None if the whole image is shown
+        """
+        if crop is None:
+            return None
+        if isinstance(crop, QRectF):
+            crop = (crop.x(), crop.y(), crop.width(), crop.height())
+
+        x, y, width, height = (float(v) for v in crop)
+        x, y = min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+        width, height = min(max(width, 0.0), 1.0 - x), min(max(height, 0.0), 1.0 - y)
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Empty background crop {crop}")
+
+        crop = (round(x, 4), round(y, 4), round(width, 4), round(height, 4))
+        return None if crop == (0.0, 0.0, 1.0, 1.0) else crop
+
+    def get(self, name: str):
+        """Get an overridden setting, or None if the profile follows the configuration"""
+        return getattr(self, name) if name in self.SETTINGS else None
+
+    def __repr__(self):
+        settings = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.SETTINGS
+                             if getattr(self, name) is not None)
+        return f"BackgroundProfile({settings})"
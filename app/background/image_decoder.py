@@ -0,0 +1,77 @@
+# coding: utf-8
+"""
+Image Decoder - Decodes background sources upright, in sRGB and at reduced size when possible
+"""
+
+import logging
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler, QColorSpace
+from PyQt5.QtCore import Qt
+
+from .trace import traced
+from .pixel_format import pixel_formats
+
+logger = logging.getLogger(__name__)
+
+_SRGB = QColorSpace(QColorSpace.SRgb)
+
+
+def get_image_size(image_path: str) -> QSize:
+    """Get the size of an image as displayed, i.e. after EXIF orientation, from its header
+
+    Args:
+        image_path: Path to the image file
+
+    Returns:
+        QSize: Oriented image size, invalid if the header cannot be read
+    """
+    reader = QImageReader(image_path)
+    size = reader.size()
+    if size.isValid() and reader.transformation() & QImageIOHandler.TransformationRotate90:
+        size.transpose()
+    return size
+
+
+@traced("decode")
+def decode_image(image_path: str, target_size: QSize = None,
+                 aspect_mode=Qt.KeepAspectRatioByExpanding) -> QImage:
+    """Decode an image with EXIF orientation applied and embedded colour profiles converted to sRGB
+
+    Downscaling, rotation and colour conversion all happen on the reduced image, so large sources
+    never go through an extra full-resolution pass.
+
+    Args:
+        image_path: Path to the image file
+        target_size: Size the image will be scaled to afterwards, None decodes at full size
+        aspect_mode: How the image will be fitted into target_size
+
+    Returns:
+        QImage: Decoded image in Format_RGB32 or Format_ARGB32_Premultiplied, null if the image cannot be read
+    """
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+
+    stored_size = reader.size()
+    if target_size is not None and stored_size.isValid():
+        # The scaled size applies to the stored pixels, before the EXIF rotation
+        transposed = bool(reader.transformation() & QImageIOHandler.TransformationRotate90)
+        oriented_size = stored_size.transposed() if transposed else stored_size
+        decode_size = oriented_size.scaled(target_size, aspect_mode)
+
+        # Only ever decode smaller, the plugin (e.g. libjpeg DCT scaling) does the heavy lifting
+        if decode_size.width() < oriented_size.width() and decode_size.height() < oriented_size.height():
+            reader.setScaledSize(decode_size.transposed() if transposed else decode_size)
+
+    image = reader.read()
+    if image.isNull():
+        logger.debug(f"Failed to decode image {image_path}: {reader.errorString()}")
+        return image
+
+    # Indexed, RGB888, 16-bit and grayscale sources are converted once here instead of on every paint
+    image = pixel_formats.normalize(image, "decode")
+
+    color_space = image.colorSpace()
+    if color_space.isValid() and color_space != _SRGB:
+        image.convertToColorSpace(_SRGB)
+
+    return image
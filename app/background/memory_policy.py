@@ -0,0 +1,123 @@
+# coding: utf-8
+"""
+Memory Policy - Trims background caches while the window is idle, hidden or minimized
+"""
+
+import time
+import logging
+from collections import deque
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget
+
+from .background_manager import BackgroundManager
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryTrimPolicy(QObject):
+    """Memory trim policy - Drops sized background renders when they are unlikely to be needed"""
+
+    # Signal emitted with the bytes held by the background caches after each sample
+    memoryUsageChanged = pyqtSignal(int)
+
+    SAMPLE_INTERVAL = 10        # Seconds between two memory usage samples
+    SAMPLE_LIMIT = 360          # Number of samples kept (one hour at the default interval)
+
+    def __init__(self, background_manager: BackgroundManager, window: QWidget, idle_timeout=120, parent=None):
+        """
+        Args:
+            background_manager: Background manager whose caches are trimmed
+            window: Top level window whose visibility and activity is watched
+            idle_timeout: Seconds without repaint before trimming, 0 disables idle trimming
+            parent: Parent object, defaults to the window
+        """
+        super().__init__(parent or window)
+        self.background_manager = background_manager
+        self.window = window
+        self.idle_timeout = 0
+        self.trim_count = 0
+        self.peak_bytes = 0
+        self._samples = deque(maxlen=self.SAMPLE_LIMIT)
+        self._trimmed = False
+
+        self._idle_timer = QTimer(self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(lambda: self.trim("idle"))
+
+        self._sample_timer = QTimer(self)
+        self._sample_timer.setInterval(self.SAMPLE_INTERVAL * 1000)
+        self._sample_timer.timeout.connect(self.sample)
+        self._sample_timer.start()
+
+        self.set_idle_timeout(idle_timeout)
+        self.window.installEventFilter(self)
+
+    def set_idle_timeout(self, seconds: int):
+        """Set the idle period after which sized renders are dropped
+
+        Args:
+            seconds: Idle period in seconds, 0 disables idle trimming
+        """
+        self.idle_timeout = max(0, int(seconds))
+        if self.idle_timeout and self.window.isVisible():
+            self._idle_timer.start(self.idle_timeout * 1000)
+        else:
+            self._idle_timer.stop()
+
+    def trim(self, reason="manual"):
+        """Trim the background caches now
+
+        Args:
+            reason: Why the caches are trimmed, only used for logging
+        """
+        self._idle_timer.stop()
+        if self._trimmed:
+            return
+
+        self.background_manager.trim_memory()
+        self._trimmed = True
+        self.trim_count += 1
+        logger.info(f"Background caches trimmed ({reason})")
+        self.sample()
+
+    def sample(self) -> int:
+        """Record the bytes currently held by the background caches
+
+        Returns:
+            int: Bytes held by the background caches
+        """
+        usage = self.background_manager.get_memory_usage()
+        self.peak_bytes = max(self.peak_bytes, usage)
+        self._samples.append((time.time(), usage))
+        self.memoryUsageChanged.emit(usage)
+        return usage
+
+    def get_metrics(self) -> dict:
+        """Get memory usage metrics
+
+        Returns:
+            dict: Current and peak bytes held, trim count and the (timestamp, bytes) samples
+        """
+        return {
+            "current_bytes": self.background_manager.get_memory_usage(),
+            "peak_bytes": self.peak_bytes,
+            "trim_count": self.trim_count,
+            "samples": list(self._samples),
+        }
+
+    def eventFilter(self, obj, e):
+        if obj is self.window:
+            if e.type() == QEvent.Hide:
+                self.trim("hidden")
+            elif e.type() == QEvent.WindowStateChange and self.window.isMinimized():
+                self.trim("minimized")
+            elif e.type() in (QEvent.Show, QEvent.Paint):
+                self._on_activity()
+
+        return super().eventFilter(obj, e)
+
+    def _on_activity(self):
+        """Restart the idle period, the next paint restores the trimmed render"""
+        self._trimmed = False
+        if self.idle_timeout:
+            self._idle_timer.start(self.idle_timeout * 1000)
@@ -0,0 +1,154 @@
+# coding: utf-8
+"""
+Pixel Format - Keeps background images in the raster engine's fast 32-bit formats and counts conversions
+"""
+
+import logging
+import threading
+from collections import Counter
+from PyQt5.QtGui import QImage, QPixmap
+
+from .trace import tracer
+
+logger = logging.getLogger(__name__)
+
+# Formats QPainter blends without converting: opaque images as RGB32, images with alpha premultiplied
+NATIVE_FORMATS = (QImage.Format_RGB32, QImage.Format_ARGB32_Premultiplied)
+
+_FORMAT_NAMES = {getattr(QImage, name): name[len("Format_"):] for name in dir(QImage) if name.startswith("Format_")}
+
+
+def get_native_format(image: QImage) -> QImage.Format:
+    """Get the fast format of an image, Format_RGB32 unless it has an alpha channel
+
+    Args:
+        image: Image in any format
+
+    Returns:
+        QImage.Format: Format_ARGB32_Premultiplied or Format_RGB32
+    """
+    return QImage.Format_ARGB32_Premultiplied if image.hasAlphaChannel() else QImage.Format_RGB32
+
+
+def get_format_name(image_format) -> str:
+    """Get the name of an image format without its Format_ prefix, e.g. Indexed8"""
+    return _FORMAT_NAMES.get(image_format, str(int(image_format)))
+
+
+class PixelFormatStats:
+    """Pixel format statistics - Format of each pipeline stage and the conversions done per stage
+
+    Sources are converted once when they enter the pipeline, so after decoding every stage should
+    report a native format and only the "decode" stage should count conversions. The "paint" stage
+    counts draws of pixmaps in other formats, which QPainter converts again on every paint.
+
+    Workers (thumbnails, theme variants, pre-rendering) normalize images too, the counters are locked.
+    """
+
+    PIXMAP_MEMO_LIMIT = 256     # Painted pixmaps whose format is remembered
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {}              # stage -> name of the last format seen
+        self._conversions = Counter()   # stage -> number of conversions
+        self._paints = 0
+        self._pixmap_formats = {}       # QPixmap.cacheKey() -> format, paints never read pixels back
+
+    def normalize(self, image: QImage, stage: str) -> QImage:
+        """Convert an image to its native format if needed, recording the stage's format
+
+        Args:
+            image: Image produced by the stage
+            stage: Pipeline stage, e.g. "decode"
+
+        Returns:
+            QImage: The image itself if it already is native, otherwise a converted copy
+        """
+        if image.isNull() or image.format() in NATIVE_FORMATS:
+            self.record(stage, image.format())
+            return image
+
+        source_format = get_format_name(image.format())
+        with tracer.span("convert format", stage=stage, source=source_format):
+            converted = image.convertToFormat(get_native_format(image))
+
+        with self._lock:
+            self._conversions[stage] += 1
+            self._formats[stage] = get_format_name(converted.format())
+        logger.debug(f"{stage}: {source_format} image converted to {get_format_name(converted.format())}")
+        return converted
+
+    def normalize_pixmap(self, pixmap: QPixmap, stage: str) -> QPixmap:
+        """Convert a pixmap to its native format if needed, recording the stage's format
+
+        Pixmaps of the raster engine wrap a QImage, so reading the format does not copy pixels.
+
+        Args:
+            pixmap: Pixmap produced by the stage
+            stage: Pipeline stage, e.g. "scale"
+
+        Returns:
+            QPixmap: The pixmap itself if it already is native, otherwise a converted copy
+        """
+        if pixmap.isNull():
+            return pixmap
+
+        image = pixmap.toImage()
+        normalized = self.normalize(image, stage)
+        if normalized is image:
+            self._remember_pixmap(pixmap, image.format())
+            return pixmap
+
+        result = QPixmap.fromImage(normalized)
+        result.setDevicePixelRatio(pixmap.devicePixelRatio())
+        self._remember_pixmap(result, normalized.format())
+        return result
+
+    def record(self, stage: str, image_format):
+        """Record the format an image left a stage in"""
+        with self._lock:
+            self._formats[stage] = get_format_name(image_format)
+
+    def record_paint(self, pixmap: QPixmap):
+        """Count a draw of a pixmap, a draw of a non-native pixmap counts as a conversion
+
+        Pixmaps normalized by `normalize_pixmap` are known by their cache key, others are inspected
+        on their first paint only.
+        """
+        image_format = self._pixmap_formats.get(pixmap.cacheKey())
+        if image_format is None:
+            image_format = pixmap.toImage().format()
+            self._remember_pixmap(pixmap, image_format)
+
+        with self._lock:
+            self._paints += 1
+            self._formats["paint"] = get_format_name(image_format)
+            if image_format not in NATIVE_FORMATS:
+                self._conversions["paint"] += 1
+
+    def get_stats(self) -> dict:
+        """Get the recorded formats and conversion counters
+
+        Returns:
+            dict: "formats" maps stages to format names, "conversions" stages to conversion counts
+            and "paints" is the number of background draws
+        """
+        with self._lock:
+            return {"formats": dict(self._formats), "conversions": dict(self._conversions), "paints": self._paints}
+
+    def reset(self):
+        """Clear the recorded formats and counters"""
+        with self._lock:
+            self._formats.clear()
+            self._conversions.clear()
+            self._paints = 0
+            self._pixmap_formats.clear()
+
+    def _remember_pixmap(self, pixmap: QPixmap, image_format):
+        with self._lock:
+            if len(self._pixmap_formats) >= self.PIXMAP_MEMO_LIMIT:
+                self._pixmap_formats.clear()
+            self._pixmap_formats[pixmap.cacheKey()] = image_format
+
+
+pixel_formats = PixelFormatStats()
@@ -0,0 +1,90 @@
+# coding: utf-8
+"""
+Pre-renderer - Renders backgrounds offscreen in a process pool and fills the persistent render cache
+"""
+
+import os
+import logging
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from PyQt5.QtCore import QSize
+from PyQt5.QtGui import QGuiApplication
+
+from .background_manager import BackgroundManager
+from .render_cache import PersistentRenderCache
+from . import tiled_blur
+
+logger = logging.getLogger(__name__)
+
+# Per-process state of pool workers
+_worker_app = None
+_worker_manager = None
+_worker_caches = {}
+
+
+def _init_worker():
+    """Create the offscreen Qt application needed for QPixmap in a worker process"""
+    global _worker_app, _worker_manager
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    _worker_app = QGuiApplication.instance() or QGuiApplication([])
+    _worker_manager = BackgroundManager()
+
+    # The pool already runs one job per core, threaded blurs would only oversubscribe it
+    tiled_blur.set_max_threads(1)
+
+
+def _render_job(job: tuple) -> tuple:
+    """Render one combination of parameters and store it in the cache
+
+    Args:
+        job: (image path, width, height, device pixel ratio, blur radius, display mode, variant, cache dir)
+
+    Returns:
+        tuple: (job, written file path or empty string, error message or empty string)
+    """
+    image_path, width, height, device_pixel_ratio, blur_radius, display_mode, variant, cache_dir = job
+    try:
+        cache = _worker_caches.setdefault(cache_dir, PersistentRenderCache(cache_dir))
+        pixmap = _worker_manager.render_background(
+            image_path, QSize(width, height), blur_radius, display_mode, device_pixel_ratio, variant)
+        if pixmap is None:
+            return job, "", "cannot decode image"
+
+        path = cache.store(pixmap.toImage(), image_path, width, height, device_pixel_ratio,
+                           blur_radius, display_mode, variant)
+        return job, path, "" if path else "cannot write cache file"
+
+    except Exception as e:
+        return job, "", str(e)
+
+
+def prerender(image_path: str, sizes, device_pixel_ratios=(1.0,), blur_radii=(0,), display_modes=("Keep Aspect Ratio",),
+              variants=(None,), cache_dir=PersistentRenderCache.DEFAULT_CACHE_DIR, jobs=None):
+    """Render every combination of the given parameters in parallel
+
+    Args:
+        image_path: Path to the source image
+        sizes: Window sizes as (width, height) in device independent pixels
+        device_pixel_ratios: Device pixel ratios to render for
+        blur_radii: Blur radii in pixels
+        display_modes: Display mode strings
+        variants: Theme variants, None renders the theme neutral background
+        cache_dir: Persistent render cache directory
+        jobs: Number of worker processes, defaults to the number of CPU cores
+
+    Yields:
+        tuple: (job, written file path or empty string, error message or empty string) per render
+    """
+    image_path = os.path.abspath(image_path)
+    job_list = [
+        (image_path, width, height, float(dpr), int(blur), mode, variant, cache_dir)
+        for (width, height), dpr, blur, mode, variant
+        in itertools.product(sizes, device_pixel_ratios, blur_radii, display_modes, variants)
+    ]
+
+    # Qt must not be forked, every worker starts a fresh interpreter
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count(), mp_context=context,
+                             initializer=_init_worker) as executor:
+        yield from executor.map(_render_job, job_list)
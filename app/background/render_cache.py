@@ -0,0 +1,148 @@
+# coding: utf-8
+"""
+Render Cache - Persistent on-disk cache of pre-rendered backgrounds
+"""
+
+import os
+import hashlib
+import logging
+from PyQt5.QtGui import QImage
+
+from . import tiled_blur
+
+logger = logging.getLogger(__name__)
+
+
+class PersistentRenderCache:
+    """Persistent render cache - Backgrounds rendered ahead of time, e.g. by `prerender.py`
+
+    Entries are PNG files named after a hash of the source content fingerprint and the render
+    parameters, so a cache built on one machine is valid on every machine with the same image.
+    """
+
+    DEFAULT_CACHE_DIR = "cache/renders"
+    FORMAT_VERSION = 3       # 2: sources are decoded upright and in sRGB, 3: tiled Gaussian blur
+    FINGERPRINT_BLOCK = 64 * 1024   # Bytes hashed at both ends of the source file
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._fingerprints = {}
+        self._entries = set()
+
+        # List the available entries once, lookups never touch the disk for missing renders
+        try:
+            self._entries = {name[:-4] for name in os.listdir(cache_dir) if name.endswith(".png")}
+        except OSError:
+            pass
+
+        if self._entries:
+            logger.info(f"{len(self._entries)} pre-rendered backgrounds available in {cache_dir}")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fingerprint(self, image_path: str) -> str:
+        """Get the content fingerprint of a source image
+
+        Hashes the file size and its first and last blocks, which is independent of
+        the file path and modification time but cheap to compute for large images.
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            str: Hex digest of the fingerprint
+        """
+        stat = os.stat(image_path)
+        identity = (os.path.abspath(image_path), stat.st_mtime_ns, stat.st_size)
+        if identity in self._fingerprints:
+            return self._fingerprints[identity]
+
+        digest = hashlib.sha1(str(stat.st_size).encode('utf-8'))
+        with open(image_path, 'rb') as f:
+            digest.update(f.read(self.FINGERPRINT_BLOCK))
+            if stat.st_size > self.FINGERPRINT_BLOCK:
+                f.seek(max(self.FINGERPRINT_BLOCK, stat.st_size - self.FINGERPRINT_BLOCK))
+                digest.update(f.read())
+
+        self._fingerprints[identity] = digest.hexdigest()
+        return self._fingerprints[identity]
+
+    def make_key(self, image_path: str, width: int, height: int, device_pixel_ratio: float,
+                 blur_radius: int, display_mode: str, variant: str = None) -> str:
+        """Get the cache key of a render
+
+        Args:
+            image_path: Path to the source image
+            width: Window width in device independent pixels
+            height: Window height in device independent pixels
+            device_pixel_ratio: Device pixel ratio of the window
+            blur_radius: Blur radius in pixels
+            display_mode: Display mode string
+            variant: Theme variant ("light" or "dark") or None
+
+        Returns:
+            str: Cache key
+        """
+        # Large blurs differ between builds with and without NumPy, the pipeline blurs in device pixels
+        if blur_radius > 0:
+            blur = f"{blur_radius}:{tiled_blur.get_implementation(round(blur_radius * device_pixel_ratio))}"
+        else:
+            blur = "0"
+        params = (f"v{self.FORMAT_VERSION}|{self.fingerprint(image_path)}|{width}x{height}@"
+                  f"{device_pixel_ratio:g}|{blur}|{display_mode}|{variant or ''}")
+        return hashlib.sha1(params.encode('utf-8')).hexdigest()
+
+    def load(self, image_path: str, width: int, height: int, device_pixel_ratio: float,
+             blur_radius: int, display_mode: str, variant: str = None) -> QImage:
+        """Load a pre-rendered background
+
+        Returns:
+            QImage: Render or a null image if it is not cached
+        """
+        if not self._entries:
+            return QImage()
+
+        try:
+            key = self.make_key(image_path, width, height, device_pixel_ratio, blur_radius, display_mode, variant)
+        except OSError:
+            return QImage()
+
+        if key not in self._entries:
+            return QImage()
+
+        image = QImage(self._path(key))
+        if image.isNull():
+            logger.warning(f"Corrupted pre-rendered background {self._path(key)}")
+            self._entries.discard(key)
+
+        return image
+
+    def store(self, image: QImage, image_path: str, width: int, height: int, device_pixel_ratio: float,
+              blur_radius: int, display_mode: str, variant: str = None) -> str:
+        """Write a render to the cache (temp file plus rename)
+
+        Returns:
+            str: Path of the written file, or an empty string if writing failed
+        """
+        key = self.make_key(image_path, width, height, device_pixel_ratio, blur_radius, display_mode, variant)
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if not image.save(temp_path, "PNG"):
+                return ""
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write pre-rendered background {path}: {str(e)}")
+            return ""
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._entries.add(key)
+        return path
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.png")
@@ -0,0 +1,165 @@
+# coding: utf-8
+"""
+Shared Render Cache - Processed backgrounds shared between application instances through shared memory
+"""
+
+import struct
+import logging
+from collections import OrderedDict
+from PyQt5.QtCore import QSharedMemory
+from PyQt5.QtGui import QImage
+from PyQt5 import sip
+
+from .render_cache import PersistentRenderCache
+from .pixel_format import pixel_formats
+
+logger = logging.getLogger(__name__)
+
+
+class SharedRenderCache:
+    """Shared render cache - The first instance publishes a render, the others map it with zero copies
+
+    Each render lives in a named shared memory segment keyed like the persistent render cache, so
+    instances showing the same background at the same size find each other's pixels. A segment is
+    destroyed by the system once no instance is attached to it any more.
+
+    Images returned by `load` and `publish` point into the mapped segment: they stay valid only
+    until the segment is released. They are read-only, painting on them detaches a private copy.
+    """
+
+    KEY_PREFIX = "PyQtFluentBackground"
+    MAGIC = b"BGS1"
+    HEADER = struct.Struct("<4siiiid")      # magic, width, height, bytes per line, format, pixel ratio
+    HEADER_SIZE = 64                        # Pixels start on a cache line boundary
+
+    def __init__(self, render_cache: PersistentRenderCache = None):
+        self._render_cache = render_cache or PersistentRenderCache()
+        self._segments = OrderedDict()      # key -> attached QSharedMemory
+
+    def __len__(self):
+        return len(self._segments)
+
+    def make_key(self, image_path: str, width: int, height: int, device_pixel_ratio: float,
+                 blur_radius: int, display_mode: str, variant: str = None) -> str:
+        """Get the shared memory key of a render
+
+        Returns:
+            str: Key of the segment, or an empty string if the source cannot be fingerprinted
+        """
+        try:
+            key = self._render_cache.make_key(image_path, width, height, device_pixel_ratio,
+                                              blur_radius, display_mode, variant)
+        except OSError:
+            return ""
+
+        return f"{self.KEY_PREFIX}_{key}"
+
+    def load(self, key: str) -> QImage:
+        """Map a render published by this or another instance
+
+        Args:
+            key: Segment key returned by `make_key`
+
+        Returns:
+            QImage: Image backed by the mapped segment, or a null image if nobody published it
+        """
+        if not key:
+            return QImage()
+
+        segment = self._segments.get(key)
+        if segment is None:
+            segment = QSharedMemory(key)
+            if not segment.attach(QSharedMemory.ReadOnly):
+                return QImage()
+
+        image = self._map_image(segment)
+        if image.isNull():
+            segment.detach()
+            self._segments.pop(key, None)
+            return image
+
+        self._segments[key] = segment
+        return image
+
+    def publish(self, key: str, image: QImage) -> QImage:
+        """Copy a render into a new segment so other instances can map it
+
+        Args:
+            key: Segment key returned by `make_key`
+            image: Processed render
+
+        Returns:
+            QImage: Image backed by the segment, to be used instead of the private copy, or a null
+            image if the render could not be published (e.g. another instance did it first)
+        """
+        if not key or image.isNull():
+            return QImage()
+
+        # Renders are already native, mapped copies must not need a conversion on every paint either
+        image = pixel_formats.normalize(image, "shared")
+
+        segment = QSharedMemory(key)
+        if not segment.create(self.HEADER_SIZE + image.sizeInBytes()):
+            if segment.error() == QSharedMemory.AlreadyExists:
+                return self.load(key)
+
+            logger.debug(f"Failed to create shared background segment: {segment.errorString()}")
+            return QImage()
+
+        segment.lock()
+        try:
+            memory = self._memoryview(segment)
+            pixels = image.constBits()
+            pixels.setsize(image.sizeInBytes())
+            memory[self.HEADER_SIZE:self.HEADER_SIZE + image.sizeInBytes()] = memoryview(pixels)
+
+            # The header goes last, readers never see a half written segment as valid
+            memory[:self.HEADER.size] = self.HEADER.pack(
+                self.MAGIC, image.width(), image.height(), image.bytesPerLine(), int(image.format()),
+                image.devicePixelRatio())
+        finally:
+            segment.unlock()
+
+        self._segments[key] = segment
+        return self._map_image(segment)
+
+    def release(self, key: str):
+        """Detach from a segment, images of this segment must not be used any more"""
+        segment = self._segments.pop(key, None)
+        if segment is not None:
+            segment.detach()
+
+    def clear(self):
+        """Detach from all segments, images of these segments must not be used any more"""
+        for segment in self._segments.values():
+            segment.detach()
+
+        self._segments.clear()
+
+    def _memoryview(self, segment: QSharedMemory) -> memoryview:
+        data = segment.data()
+        data.setsize(segment.size())
+        return memoryview(data)
+
+    def _map_image(self, segment: QSharedMemory) -> QImage:
+        """Build an image on top of the segment pixels without copying them"""
+        if segment.size() < self.HEADER_SIZE:
+            return QImage()
+
+        segment.lock()
+        try:
+            data = segment.constData()
+            data.setsize(self.HEADER.size)
+            magic, width, height, bytes_per_line, image_format, ratio = self.HEADER.unpack(bytes(data))
+        finally:
+            segment.unlock()
+
+        if magic != self.MAGIC or self.HEADER_SIZE + height * bytes_per_line > segment.size():
+            return QImage()
+
+        # A read-only pointer makes Qt treat the pixels as const: painting on the image or calling
+        # bits() detaches it into a private copy instead of writing into the (read-only) mapping
+        pixels = sip.voidptr(int(data) + self.HEADER_SIZE, height * bytes_per_line, False)
+        image = QImage(pixels, width, height, bytes_per_line, QImage.Format(image_format))
+        image.setDevicePixelRatio(ratio)
+        return image
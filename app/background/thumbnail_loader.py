@@ -0,0 +1,222 @@
+# coding: utf-8
+"""
+Thumbnail Loader - Scans image folders and generates background thumbnails off the GUI thread
+"""
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, QRect, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtCore import Qt
+
+from .background_manager import SUPPORTED_FORMATS
+from .image_decoder import decode_image
+from .trace import traced
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailSignals(QObject):
+    """Signals shared by thumbnail worker tasks (lives in the GUI thread)"""
+
+    # Emitted with (generation, sorted image paths) when a folder scan finishes
+    folderScanned = pyqtSignal(int, list)
+
+    # Emitted with (generation, image path, thumbnail image) when a thumbnail is ready
+    thumbnailReady = pyqtSignal(int, str, QImage)
+
+
+class FolderScanTask(QRunnable):
+    """Worker task listing the supported images of a folder"""
+
+    def __init__(self, folder: str, generation: int, signals: ThumbnailSignals):
+        super().__init__()
+        self.folder = folder
+        self.generation = generation
+        self.signals = signals
+
+    def run(self):
+        paths = []
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if not entry.is_file():
+                        continue
+                    if os.path.splitext(entry.name)[1].lower() in SUPPORTED_FORMATS:
+                        paths.append(entry.path)
+        except OSError as e:
+            logger.error(f"Failed to scan background folder {self.folder}: {str(e)}")
+
+        paths.sort(key=lambda p: os.path.basename(p).lower())
+        self.signals.folderScanned.emit(self.generation, paths)
+
+
+class ThumbnailTask(QRunnable):
+    """Worker task producing a single thumbnail, from the disk cache when possible"""
+
+    def __init__(self, image_path: str, size: QSize, cache_dir: str, generation: int,
+                 signals: ThumbnailSignals):
+        super().__init__()
+        self.image_path = image_path
+        self.size = QSize(size)
+        self.cache_dir = cache_dir
+        self.generation = generation
+        self.signals = signals
+
+    @traced("thumbnail")
+    def run(self):
+        try:
+            cache_path = self._cache_path()
+            image = QImage()
+            if cache_path and os.path.exists(cache_path):
+                image = QImage(cache_path)
+
+            if image.isNull():
+                image = self._decode_thumbnail()
+                if not image.isNull() and cache_path:
+                    self._save_to_cache(image, cache_path)
+
+            if not image.isNull():
+                self.signals.thumbnailReady.emit(self.generation, self.image_path, image)
+
+        except Exception as e:
+            logger.error(f"Failed to create thumbnail for {self.image_path}: {str(e)}")
+
+    def _cache_path(self) -> str:
+        """Get the disk cache path of this thumbnail, keyed by file identity and size"""
+        if not self.cache_dir:
+            return ""
+
+        try:
+            stat = os.stat(self.image_path)
+        except OSError:
+            return ""
+
+        # v2: thumbnails are decoded upright and in sRGB
+        identity = (f"v2|{os.path.abspath(self.image_path)}|{stat.st_mtime_ns}|{stat.st_size}|"
+                    f"{self.size.width()}x{self.size.height()}")
+        digest = hashlib.sha1(identity.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.png")
+
+    def _decode_thumbnail(self) -> QImage:
+        """Decode the image at reduced size and center-crop it to the thumbnail size"""
+        # Let the image plugin downscale while decoding (JPEG decodes at 1/2, 1/4 or 1/8 scale)
+        image = decode_image(self.image_path, self.size)
+        if image.isNull():
+            return image
+
+        image = image.scaled(self.size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+        x = (image.width() - self.size.width()) // 2
+        y = (image.height() - self.size.height()) // 2
+        return image.copy(QRect(x, y, self.size.width(), self.size.height()))
+
+    def _save_to_cache(self, image: QImage, cache_path: str):
+        """Write the thumbnail to the disk cache (temp file plus rename)"""
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if image.save(temp_path, "PNG"):
+                os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Failed to cache thumbnail {cache_path}: {str(e)}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class ThumbnailLoader(QObject):
+    """Thumbnail loader - Asynchronous folder scanning and thumbnail generation with caching"""
+
+    # Emitted with the sorted image paths of the current folder
+    folderScanned = pyqtSignal(list)
+
+    # Emitted when the thumbnail of an image path becomes available
+    thumbnailReady = pyqtSignal(str)
+
+    THUMBNAIL_SIZE = QSize(160, 100)
+    MEMORY_CACHE_LIMIT = 512    # Maximum number of thumbnails kept in memory
+    DEFAULT_CACHE_DIR = "cache/thumbnails"
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, thumbnail_size=THUMBNAIL_SIZE, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.thumbnail_size = QSize(thumbnail_size)
+        self._generation = 0
+        self._priority = 0
+        self._pending = set()
+        self._pixmap_cache = OrderedDict()
+
+        self._thread_pool = QThreadPool(self)
+        self._thread_pool.setMaxThreadCount(max(1, QThreadPool.globalInstance().maxThreadCount() - 1))
+
+        self._signals = ThumbnailSignals(self)
+        self._signals.folderScanned.connect(self._on_folder_scanned)
+        self._signals.thumbnailReady.connect(self._on_thumbnail_ready)
+
+    def scan_folder(self, folder: str):
+        """Start scanning a folder, discarding queued work of the previous folder
+
+        Args:
+            folder: Folder containing background images
+        """
+        self._generation += 1
+        self._thread_pool.clear()
+        self._pending.clear()
+
+        if not folder or not os.path.isdir(folder):
+            self.folderScanned.emit([])
+            return
+
+        self._thread_pool.start(FolderScanTask(folder, self._generation, self._signals))
+
+    def thumbnail(self, image_path: str) -> QPixmap:
+        """Get the cached thumbnail of an image, requesting it if not loaded yet
+
+        Args:
+            image_path: Path to the image file
+
+        Returns:
+            QPixmap: Thumbnail pixmap or None if it is still being generated
+        """
+        pixmap = self._pixmap_cache.get(image_path)
+        if pixmap is not None:
+            self._pixmap_cache.move_to_end(image_path)
+            return pixmap
+
+        if image_path not in self._pending:
+            self._pending.add(image_path)
+
+            # Most recent requests first, so the rows currently on screen win over scrolled-away ones
+            self._priority += 1
+            task = ThumbnailTask(image_path, self.thumbnail_size, self.cache_dir,
+                                 self._generation, self._signals)
+            self._thread_pool.start(task, self._priority)
+
+        return None
+
+    def cancel(self):
+        """Cancel all queued scans and thumbnail tasks"""
+        self._generation += 1
+        self._thread_pool.clear()
+        self._pending.clear()
+
+    def clear_cache(self):
+        """Clear in-memory thumbnails (the disk cache is kept)"""
+        self._pixmap_cache.clear()
+
+    def _on_folder_scanned(self, generation: int, paths: list):
+        if generation == self._generation:
+            self.folderScanned.emit(paths)
+
+    def _on_thumbnail_ready(self, generation: int, image_path: str, image: QImage):
+        self._pending.discard(image_path)
+        if generation != self._generation:
+            return
+
+        self._pixmap_cache[image_path] = QPixmap.fromImage(image)
+        if len(self._pixmap_cache) > self.MEMORY_CACHE_LIMIT:
+            self._pixmap_cache.popitem(last=False)
+
+        self.thumbnailReady.emit(image_path)
@@ -0,0 +1,242 @@
+# coding: utf-8
+"""
+Tiled Blur - Multi-core Gaussian blur of large images, processed as overlapping stripes
+"""
+
+import os
+import math
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage
+
+from .trace import traced
+from .pixel_format import pixel_formats
+
+try:
+    import numpy as np
+except ImportError:     # NumPy is optional, callers fall back to the single-threaded Qt blur
+    np = None
+
+logger = logging.getLogger(__name__)
+
+BOX_PASSES = 3          # Three box blurs approximate a Gaussian within a few percent
+MIN_STRIPE_HEIGHT = 64  # Smaller stripes spend more time on padding than on blurring
+REDUCED_RADIUS = 2      # Blurs run on a copy shrunk until the radius is about this size, within 1% of a full blur
+MIN_REDUCTION = 4       # Reduced less, the box passes cost more than the Qt scale-down blur
+
+_executor = None
+_max_threads = os.cpu_count() or 1
+
+
+def is_available() -> bool:
+    """Check whether the tiled blur can be used (NumPy is installed)"""
+    return np is not None
+
+
+def is_used_for(radius: int) -> bool:
+    """Check whether the render pipeline blurs with the tiled Gaussian at this radius
+
+    Smaller radii cannot be reduced enough to beat the Qt scale-down blur, they keep using it.
+
+    Args:
+        radius: Blur radius in device pixels
+    """
+    return is_available() and radius >= REDUCED_RADIUS * MIN_REDUCTION
+
+
+def get_implementation(radius: int) -> str:
+    """Get the name of the blur the render pipeline uses at a radius, renders of different blurs differ
+
+    Args:
+        radius: Blur radius in device pixels
+
+    Returns:
+        str: "box3/2" for the reduced tiled Gaussian, "scaled" for the Qt scale-down blur
+    """
+    return f"box{BOX_PASSES}/{REDUCED_RADIUS}" if is_used_for(radius) else "scaled"
+
+
+def get_max_threads() -> int:
+    """Get the number of threads used by `blur_image` by default"""
+    return _max_threads
+
+
+def set_max_threads(count: int):
+    """Set the number of threads used by `blur_image` by default
+
+    Args:
+        count: Number of threads, e.g. 1 in processes that already run one job per core
+    """
+    global _max_threads
+    _max_threads = max(1, int(count))
+
+
+def box_radii(sigma: float, passes: int = BOX_PASSES) -> list:
+    """Get the radii of the box blurs approximating a Gaussian blur
+
+    Args:
+        sigma: Standard deviation of the Gaussian
+        passes: Number of box blurs
+
+    Returns:
+        list: Radius of each box blur pass
+    """
+    ideal_width = math.sqrt(12 * sigma * sigma / passes + 1)
+    lower = int(ideal_width)
+    if lower % 2 == 0:
+        lower -= 1
+    upper = lower + 2
+
+    lower_count = round((12 * sigma * sigma - passes * lower * lower - 4 * passes * lower - 3 * passes)
+                        / (-4 * lower - 4))
+    return [(lower if i < lower_count else upper) // 2 for i in range(passes)]
+
+
+def blur_image(image: QImage, radius: int, threads: int = None) -> QImage:
+    """Blur an image with a Gaussian of standard deviation radius / 2 on several cores
+
+    The image is split into horizontal stripes padded by the total blur radius, so each stripe
+    sees the same neighbourhood as in a single pass and the stitched result has no seams. NumPy
+    releases the GIL inside its kernels, which lets the stripes run in parallel threads.
+
+    Args:
+        image: Source image
+        radius: Blur radius in pixels
+        threads: Number of stripes processed in parallel, None uses `get_max_threads()`
+
+    Returns:
+        QImage: Blurred image (RGB32 or ARGB32_Premultiplied)
+    """
+    radii = [r for r in box_radii(radius / 2) if r > 0]
+    if radius <= 0 or not radii or image.isNull():
+        return image
+
+    # Premultiplied alpha blurs correctly channel by channel, RGB32 keeps its opaque alpha
+    image = pixel_formats.normalize(image, "blur")
+
+    width, height = image.width(), image.height()
+    source = _as_array(image, writable=False)
+    result = QImage(width, height, image.format())
+    result.setDevicePixelRatio(image.devicePixelRatio())
+    target = _as_array(result, writable=True)
+
+    # Each box pass spreads pixels by its radius, so rows further away than the sum are unaffected
+    padding = sum(radii)
+    threads = max(1, threads or _max_threads)
+    stripe_count = max(1, min(threads, height // max(MIN_STRIPE_HEIGHT, padding)))
+    bounds = [(height * i // stripe_count, height * (i + 1) // stripe_count) for i in range(stripe_count)]
+
+    if stripe_count == 1:
+        _blur_stripe(source, target, 0, height, radii, padding)
+    else:
+        futures = [_get_executor().submit(_blur_stripe, source, target, top, bottom, radii, padding)
+                   for top, bottom in bounds]
+        for future in futures:
+            future.result()
+
+    return result
+
+
+def blur_image_reduced(image: QImage, radius: int, threads: int = None) -> QImage:
+    """Blur an image like `blur_image`, on a copy reduced until the radius is about `REDUCED_RADIUS`
+
+    A Gaussian leaves no detail finer than its radius, so blurring the reduced copy and scaling it
+    back up smoothly looks the same at a fraction of the cost.
+
+    Args:
+        image: Source image
+        radius: Blur radius in pixels
+        threads: Number of stripes processed in parallel, None uses `get_max_threads()`
+
+    Returns:
+        QImage: Blurred image of the source size
+    """
+    reduction = radius // REDUCED_RADIUS
+    if reduction <= 1 or image.isNull():
+        return blur_image(image, radius, threads)
+
+    width, height = image.width(), image.height()
+    small = image.scaled(max(1, width // reduction), max(1, height // reduction),
+                         Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    blurred = blur_image(small, round(radius / reduction), threads)
+
+    result = blurred.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+    result.setDevicePixelRatio(image.devicePixelRatio())
+    return result
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="TiledBlur")
+    return _executor
+
+
+def _as_array(image: QImage, writable: bool):
+    """Get a (height, width, 4) view on the pixels of a 32-bit image"""
+    bits = image.bits() if writable else image.constBits()
+    bits.setsize(image.sizeInBytes())
+    array = np.frombuffer(bits, np.uint8).reshape(image.height(), image.bytesPerLine())
+    return array[:, :image.width() * 4].reshape(image.height(), image.width(), 4)
+
+
+@traced("blur stripe")
+def _blur_stripe(source, target, top: int, bottom: int, radii: list, padding: int):
+    """Blur rows [top, bottom) of source into target, reading `padding` extra rows on each side"""
+    block_top = max(0, top - padding)
+    block_bottom = min(source.shape[0], bottom + padding)
+    block = source[block_top:block_bottom].astype(np.int32)
+
+    for radius in radii:
+        block = _box_blur(block, radius, axis=1)
+        block = _box_blur(block, radius, axis=0)
+
+    # Fixed point rounding can overshoot by one for very wide boxes
+    target[top:bottom] = np.minimum(block[top - block_top:bottom - block_top], 255)
+
+
+def _box_blur(block, radius: int, axis: int):
+    """Running-sum box blur along one axis, edges clamped"""
+    width = 2 * radius + 1
+    if axis == 0:
+        window = _running_sum_rows(block, radius)
+    else:
+        # Prefix sums are fast along the contiguous axis
+        size = block.shape[axis]
+        pad_width = [(0, 0)] * block.ndim
+        pad_width[axis] = (radius + 1, radius)
+        sums = np.cumsum(np.pad(block, pad_width, mode='edge'), axis=axis, dtype=np.int32)
+
+        upper = [slice(None)] * block.ndim
+        lower = [slice(None)] * block.ndim
+        upper[axis] = slice(width, width + size)
+        lower[axis] = slice(0, size)
+        window = sums[tuple(upper)] - sums[tuple(lower)]
+
+    # Divide by the window width in 16.16 fixed point, with rounding
+    window *= round(65536 / width)
+    window += 32768
+    window >>= 16
+    return window
+
+
+def _running_sum_rows(block, radius: int):
+    """Sum of the 2 * radius + 1 rows around each row, edges clamped
+
+    NumPy prefix sums across rows are several times slower than adding whole rows, so the
+    window slides one row at a time. Each step works on a full row and releases the GIL.
+    """
+    height = block.shape[0]
+    sums = np.empty_like(block)
+    window = np.zeros(block.shape[1:], np.int32)
+    for row in range(-radius, radius + 1):
+        window += block[min(max(row, 0), height - 1)]
+
+    sums[0] = window
+    for row in range(1, height):
+        window += block[min(row + radius, height - 1)]
+        window -= block[max(row - radius - 1, 0)]
+        sums[row] = window
+
+    return sums
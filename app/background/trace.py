@@ -0,0 +1,188 @@
+# coding: utf-8
+"""
+Trace - Records paint and render spans in memory and exports them as Chrome trace-event JSON
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+import functools
+from collections import deque
+from PyQt5.QtCore import QThread
+
+logger = logging.getLogger(__name__)
+
+# Set to enable tracing at startup: "1" keeps the trace in memory, a path also writes it there on exit
+TRACE_ENV = "BACKGROUND_TRACE"
+
+
+class TraceSpan:
+    """A running span, recorded when its `with` block exits"""
+
+    __slots__ = ('_tracer', '_name', '_category', '_args', '_start')
+
+    def __init__(self, tracer, name: str, category: str, args: dict):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def set(self, **args):
+        """Attach arguments known only once the span is running, e.g. whether a lookup hit"""
+        self._args.update(args)
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._tracer._record(self._name, self._category, self._start, time.perf_counter_ns(), self._args)
+        return False
+
+
+class _NullSpan:
+    """Span returned while tracing is disabled, does nothing"""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Tracer - Ring buffer of timed spans from any thread, exportable for chrome://tracing or Perfetto
+
+    While disabled, `span` returns a shared no-op object, so instrumented code costs one attribute
+    check per span. Once the buffer is full the oldest spans are dropped.
+    """
+
+    DEFAULT_CAPACITY = 50000    # Spans kept in memory
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._enabled = False
+        self._events = deque(maxlen=capacity)   # (name, category, start ns, duration ns, thread id, args)
+        self._thread_names = {}
+
+    def is_enabled(self) -> bool:
+        """Check whether spans are recorded"""
+        return self._enabled
+
+    def set_enabled(self, enabled: bool):
+        """Start or stop recording spans, recorded spans are kept
+
+        Args:
+            enabled: Whether spans are recorded
+        """
+        self._enabled = bool(enabled)
+
+    def span(self, name: str, category: str = "background", **args):
+        """Time a `with` block
+
+        Args:
+            name: Span name shown in the trace viewer
+            category: Span category
+            **args: Arguments shown with the span
+
+        Returns:
+            TraceSpan: Context manager recording the span
+        """
+        if not self._enabled:
+            return _NULL_SPAN
+        return TraceSpan(self, name, category, args)
+
+    def clear(self):
+        """Drop all recorded spans"""
+        self._events.clear()
+
+    def __len__(self):
+        return len(self._events)
+
+    def to_chrome_trace(self) -> dict:
+        """Get the recorded spans as a Chrome trace-event document
+
+        Returns:
+            dict: Document with complete ("X") events and thread name metadata, times in microseconds
+        """
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "Background"}}]
+        events += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                   for tid, name in list(self._thread_names.items())]
+
+        for name, category, start, duration, tid, args in list(self._events):
+            event = {"name": name, "cat": category, "ph": "X", "ts": start / 1000, "dur": duration / 1000,
+                     "pid": pid, "tid": tid}
+            if args:
+                event["args"] = {key: value if isinstance(value, (bool, int, float, str)) else str(value)
+                                 for key, value in args.items()}
+            events.append(event)
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> str:
+        """Write the recorded spans to a JSON file (temp file plus rename)
+
+        Args:
+            path: Output file, open it in chrome://tracing or https://ui.perfetto.dev
+
+        Returns:
+            str: Path of the written file, or an empty string if writing failed
+        """
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.to_chrome_trace(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write trace {path}: {str(e)}")
+            return ""
+
+        logger.info(f"{len(self._events)} trace spans written to {path}")
+        return path
+
+    def _record(self, name: str, category: str, start: int, end: int, args: dict):
+        tid = threading.get_native_id()
+        if tid not in self._thread_names:
+            # Threads started by Qt (e.g. QThreadPool workers) are only known to Python as "Dummy-N"
+            thread = threading.current_thread()
+            thread_name = thread.name
+            if isinstance(thread, threading._DummyThread):
+                thread_name = QThread.currentThread().objectName() or thread_name
+            self._thread_names[tid] = thread_name
+
+        # deque.append is atomic, spans of worker threads need no lock
+        self._events.append((name, category, start, end - start, tid, args))
+
+
+def traced(name: str, category: str = "background"):
+    """Decorator recording each call of a function as a span of the global tracer"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer._enabled:
+                return func(*args, **kwargs)
+            with TraceSpan(tracer, name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+tracer = Tracer()
+
+_trace_setting = os.environ.get(TRACE_ENV, "")
+if _trace_setting and _trace_setting != "0":
+    tracer.set_enabled(True)
+    if _trace_setting.lower().endswith(".json"):
+        atexit.register(tracer.dump, _trace_setting)
@@ -0,0 +1,445 @@
+# coding: utf-8
+"""
+Video Background - Streams a video file as the background through a small reusable frame ring
+"""
+
+import math
+import time
+import logging
+import threading
+from PyQt5.QtCore import QObject, QSize, QSizeF, QRectF, QUrl, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+
+from .trace import tracer
+
+try:
+    from PyQt5.QtMultimedia import (QMediaPlayer, QMediaContent, QAbstractVideoSurface, QAbstractVideoBuffer,
+                                    QVideoFrame, QVideoSurfaceFormat)
+except ImportError:
+    # QtMultimedia is optional, on Linux it also needs the GStreamer and PulseAudio libraries
+    QMediaPlayer = None
+
+logger = logging.getLogger(__name__)
+
+# Video file formats played as backgrounds, decoding depends on the system codecs
+VIDEO_FORMATS = {'.mp4', '.m4v', '.mov', '.webm', '.mkv', '.avi', '.wmv'}
+
+
+def is_available() -> bool:
+    """Check whether QtMultimedia can be used to play video backgrounds"""
+    return QMediaPlayer is not None
+
+
+class FrameRing:
+    """Frame ring - A few preallocated frames written in turn, so playback allocates no pixel buffers
+
+    Frames are laid out for the display mode like still renders: fitted to the window in device
+    pixels, or at the video size for "Original Size" and "Tile". Large videos are first halved
+    through a chain of intermediate images, each halving averages 2x2 pixels so no detail is skipped.
+    Blurred frames are scaled down further, by a factor growing with the blur radius, and back up
+    through the same chain, which smooths the blocks a single large upscale would leave. Buffers
+    are only allocated again when the window, video size, display mode or blur radius changes.
+    """
+
+    RING_SIZE = 3           # Frame shown, frame being written and a spare one
+    BLUR_SCALE_PER_PIXEL = 0.5  # Downscale added per pixel of blur radius
+    MAX_BLUR_SCALE = 32     # Strongest downscale, reached at radius 50 on high DPI screens
+
+    def __init__(self, count=RING_SIZE):
+        self._count = count
+        self._frames = []
+        self._steps = []        # Intermediate images, each half the size of the previous one
+        self._up_steps = []     # Intermediate images reused to scale blurred frames back up
+        self._source_rect = QRectF()
+        self._layout = None     # Arguments of the last `configure` call
+        self._index = -1        # Frame written last
+
+    def configure(self, window_size: QSize, device_pixel_ratio: float, display_mode: str, blur_radius: int,
+                  source_size: QSize) -> bool:
+        """Lay the frames out for a window, allocating them if anything changed
+
+        Args:
+            window_size: Size of the window in device independent pixels
+            device_pixel_ratio: Device pixel ratio of the window
+            display_mode: Display mode string
+            blur_radius: Blur radius in device independent pixels
+            source_size: Size of the decoded video frames
+
+        Returns:
+            bool: True if the buffers were allocated again
+        """
+        layout = (QSize(window_size), device_pixel_ratio, display_mode, blur_radius, QSize(source_size))
+        if layout == self._layout:
+            return False
+
+        # Unscaled videos keep their pixels, fitted ones are composed in device pixels
+        if display_mode in ("Original Size", "Tile"):
+            device_pixel_ratio = 1.0
+        target_size = QSize(max(1, round(window_size.width() * device_pixel_ratio)),
+                            max(1, round(window_size.height() * device_pixel_ratio)))
+
+        source_rect = QRectF(0, 0, source_size.width(), source_size.height())
+        if display_mode in ("Original Size", "Tile"):
+            frame_size = QSize(source_size)
+        elif display_mode == "Stretch":
+            frame_size = target_size
+        elif display_mode == "Fit Window":
+            frame_size = source_size.scaled(target_size, Qt.KeepAspectRatio)
+        else:
+            # Expanded like still renders, but only the part inside the window is kept
+            expanded = source_size.scaled(target_size, Qt.KeepAspectRatioByExpanding)
+            frame_size = expanded.boundedTo(target_size)
+            source_rect.setSize(QSizeF(frame_size.width() * source_size.width() / expanded.width(),
+                                      frame_size.height() * source_size.height() / expanded.height()))
+
+        frame_size = frame_size.expandedTo(QSize(1, 1))
+        self._frames = []
+        for _ in range(self._count):
+            frame = QImage(frame_size, QImage.Format_RGB32)
+            frame.fill(Qt.black)
+            frame.setDevicePixelRatio(device_pixel_ratio)
+            self._frames.append(frame)
+
+        # Every blur radius gets its own downscale, so the whole blur range changes the frame
+        blur_scale = min(self.MAX_BLUR_SCALE, 1 + blur_radius * device_pixel_ratio * self.BLUR_SCALE_PER_PIXEL)
+        smallest = QSize(max(1, round(frame_size.width() / blur_scale)),
+                         max(1, round(frame_size.height() / blur_scale)))
+
+        # Bilinear scaling reads 2x2 pixels, so one step must not shrink by more than half
+        self._steps = []
+        width, height = source_rect.width(), source_rect.height()
+        while width > 2 * smallest.width() or height > 2 * smallest.height():
+            width, height = max(smallest.width(), width / 2), max(smallest.height(), height / 2)
+            self._steps.append(QImage(math.ceil(width), math.ceil(height), QImage.Format_RGB32))
+        if blur_radius > 0:
+            # A halving that ended a pixel off the blur size (odd sizes) is replaced by the blur step
+            if self._steps and (self._steps[-1].size() - smallest).width() <= 1 and \
+                    (self._steps[-1].size() - smallest).height() <= 1:
+                self._steps.pop()
+            self._steps.append(QImage(smallest, QImage.Format_RGB32))
+
+        # Blurred frames go back up through the halvings smaller than the frame, 2x at a time
+        self._up_steps = []
+        if blur_radius > 0:
+            self._up_steps = [step for step in reversed(self._steps[:-1])
+                              if step.width() < frame_size.width() and step.height() < frame_size.height()]
+
+        self._source_rect = source_rect
+        self._layout = layout
+        self._index = -1
+        return True
+
+    def write(self, source: QImage, bottom_up: bool = False) -> QImage:
+        """Draw a decoded video frame into the next frame of the ring
+
+        Args:
+            source: Decoded frame, may point into memory of the video decoder
+            bottom_up: Whether the frame's scan lines are stored bottom to top, e.g. RGB32 from DirectShow
+
+        Returns:
+            QImage: Written frame
+        """
+        index = (self._index + 1) % len(self._frames)
+        frame = self._frames[index]
+
+        source_rect = self._source_rect
+        if bottom_up:
+            # The rows kept by a crop are counted from the bottom of the stored frame
+            source_rect = QRectF(source_rect.x(), source.height() - source_rect.bottom(),
+                                 source_rect.width(), source_rect.height())
+        for step in self._steps + self._up_steps:
+            self._draw(step, source, source_rect, bottom_up)
+            source, source_rect, bottom_up = step, QRectF(step.rect()), False
+        self._draw(frame, source, source_rect, bottom_up)
+
+        self._index = index
+        return frame
+
+    def latest(self) -> QImage:
+        """Get the frame written last, or a null image if none was written yet"""
+        return self._frames[self._index] if self._index >= 0 else QImage()
+
+    def release(self):
+        """Free all buffers, they are allocated again by the next `configure`"""
+        self._frames = []
+        self._steps = []
+        self._up_steps = []
+        self._layout = None
+        self._index = -1
+
+    def get_memory_usage(self) -> int:
+        """Get the number of bytes held by the frames"""
+        return sum(image.sizeInBytes() for image in self._frames + self._steps)
+
+    @staticmethod
+    def _draw(target: QImage, source: QImage, source_rect: QRectF, mirrored: bool = False):
+        painter = QPainter(target)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform)
+        # Target rectangle in device independent pixels, the frames carry the window's pixel ratio
+        width, height = target.width() / target.devicePixelRatio(), target.height() / target.devicePixelRatio()
+        if mirrored:
+            painter.translate(0, height)
+            painter.scale(1, -1)
+        painter.drawImage(QRectF(0, 0, width, height), source, source_rect)
+        painter.end()
+
+
+if QMediaPlayer is not None:
+    class VideoFrameSurface(QAbstractVideoSurface):
+        """Video sink handing mapped frames to a VideoBackground
+
+        Only RGB formats without a texture handle are offered, so frames are decoded and converted in
+        software and can be read directly.
+        """
+
+        PIXEL_FORMATS = [QVideoFrame.Format_RGB32, QVideoFrame.Format_ARGB32,
+                         QVideoFrame.Format_ARGB32_Premultiplied]
+
+        def __init__(self, background):
+            super().__init__(background)
+            self._background = background
+
+        def supportedPixelFormats(self, handle_type=QAbstractVideoBuffer.NoHandle):
+            return self.PIXEL_FORMATS if handle_type == QAbstractVideoBuffer.NoHandle else []
+
+        def present(self, frame):
+            # Dropped frames are never mapped
+            if not self._background._accept_frame():
+                return True
+
+            frame = QVideoFrame(frame)
+            if not frame.map(QAbstractVideoBuffer.ReadOnly):
+                return False
+
+            try:
+                image = QImage(frame.bits(), frame.width(), frame.height(), frame.bytesPerLine(),
+                               QVideoFrame.imageFormatFromPixelFormat(frame.pixelFormat()))
+                bottom_up = self.surfaceFormat().scanLineDirection() == QVideoSurfaceFormat.BottomToTop
+                self._background._on_frame(image, bottom_up)
+            finally:
+                frame.unmap()
+            return True
+
+
+class VideoBackground(QObject):
+    """Video background - Plays a video file muted and in a loop as the window background
+
+    Decoded frames are dropped before they are even mapped when they come faster than the frame
+    rate cap, while the previous frame has not been painted yet, or when decimated. The decimation
+    adapts to the time spent per shown frame, composing it plus painting it, so a slow machine
+    shows fewer frames instead of falling behind the window's own repaints.
+    """
+
+    # Signal emitted when a new frame is ready to be painted, possibly from the decoder thread
+    frameReady = pyqtSignal()
+
+    DEFAULT_FRAME_RATE = 30     # Frames shown per second at most
+    FRAME_BUDGET = 0.012        # Seconds of composing plus painting allowed per shown frame
+    MAX_DECIMATION = 8          # Show at most every 8th frame that passes the frame rate cap
+    ADAPT_INTERVAL = 15         # Shown frames between two decimation adjustments
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._ring = FrameRing()
+        self._player = None
+        self._surface = None
+        self._source = ""
+        self._layout = None             # (window size, device pixel ratio, display mode, blur radius)
+        self._paused = False
+        self._frame_interval = 1 / self.DEFAULT_FRAME_RATE
+        self._last_frame_time = 0.0
+        self._pending = False           # Whether the last written frame still waits to be painted
+        self._compose_time = 0.0
+        self._frame_cost = None         # Moving average of composing plus painting a frame
+        self._decimation = 1
+        self._cost_samples = 0
+        self._decoded = 0
+        self._shown = 0
+        self._dropped = 0
+
+    def set_source(self, video_path: str):
+        """Play a video file, does nothing if it is already playing
+
+        Args:
+            video_path: Path to the video file, an empty string stops playback
+        """
+        if video_path == self._source:
+            return
+
+        self.stop()
+        self._source = video_path
+        if not video_path:
+            return
+
+        if not is_available():
+            logger.warning("QtMultimedia is not available, video backgrounds cannot be played")
+            return
+
+        if self._player is None:
+            self._player = QMediaPlayer(self, QMediaPlayer.VideoSurface)
+            self._player.setMuted(True)
+            self._surface = VideoFrameSurface(self)
+            self._player.setVideoOutput(self._surface)
+            self._player.mediaStatusChanged.connect(self._on_media_status_changed)
+
+        self._player.setMedia(QMediaContent(QUrl.fromLocalFile(video_path)))
+        if not self._paused:
+            self._player.play()
+        logger.debug(f"Video background started: {video_path}")
+
+    def get_source(self) -> str:
+        """Get the path of the played video file"""
+        return self._source
+
+    def set_layout(self, window_size: QSize, device_pixel_ratio: float, display_mode: str, blur_radius: int):
+        """Set how frames are composed, the frame ring is laid out again with the next frame
+
+        Args:
+            window_size: Size of the window in device independent pixels
+            device_pixel_ratio: Device pixel ratio of the window
+            display_mode: Display mode string
+            blur_radius: Blur radius in device independent pixels
+        """
+        with self._lock:
+            self._layout = (QSize(window_size), device_pixel_ratio, display_mode, blur_radius)
+
+    def set_frame_rate(self, frame_rate: int):
+        """Set the number of frames shown per second at most
+
+        Args:
+            frame_rate: Frame rate cap
+        """
+        self._frame_interval = 1 / max(1, int(frame_rate))
+
+    def set_paused(self, paused: bool):
+        """Pause or resume playback, e.g. while the window is hidden
+
+        Args:
+            paused: Whether playback is paused
+        """
+        if paused == self._paused:
+            return
+
+        self._paused = paused
+        with self._lock:
+            self._pending = False
+
+        if self._player is not None and self._source:
+            if paused:
+                self._player.pause()
+            else:
+                self._player.play()
+
+    def is_paused(self) -> bool:
+        """Check whether playback is paused"""
+        return self._paused
+
+    def stop(self):
+        """Stop playback and free the frame ring"""
+        if self._player is not None:
+            self._player.stop()
+            self._player.setMedia(QMediaContent())
+
+        with self._lock:
+            self._ring.release()
+            self._pending = False
+        self._source = ""
+
+    def release_frames(self):
+        """Free the frame ring, it is allocated again with the next frame"""
+        with self._lock:
+            self._ring.release()
+            self._pending = False
+
+    def current_frame(self) -> QImage:
+        """Get the frame to paint
+
+        Returns:
+            QImage: Latest frame in Format_RGB32 with the window's pixel ratio, null before the first one
+        """
+        with self._lock:
+            return self._ring.latest()
+
+    def report_paint_time(self, seconds: float):
+        """Report the time the window took to paint the current frame, adapting the decimation
+
+        Args:
+            seconds: Duration of the paint event
+        """
+        with self._lock:
+            self._pending = False
+            cost = self._compose_time + seconds
+            self._frame_cost = cost if self._frame_cost is None else self._frame_cost * 0.8 + cost * 0.2
+            self._cost_samples += 1
+            if self._cost_samples < self.ADAPT_INTERVAL:
+                return
+
+            self._cost_samples = 0
+            if self._frame_cost > self.FRAME_BUDGET and self._decimation < self.MAX_DECIMATION:
+                self._decimation += 1
+                logger.debug(f"Video background over budget ({self._frame_cost * 1000:.1f} ms), "
+                             f"showing one frame in {self._decimation}")
+            elif self._frame_cost < self.FRAME_BUDGET / 2 and self._decimation > 1:
+                self._decimation -= 1
+
+    def get_stats(self) -> dict:
+        """Get playback statistics
+
+        Returns:
+            dict: Decoded, shown and dropped frame counts, the current decimation and the average
+            milliseconds spent per shown frame
+        """
+        with self._lock:
+            return {
+                "decoded": self._decoded,
+                "shown": self._shown,
+                "dropped": self._dropped,
+                "decimation": self._decimation,
+                "frame_cost_ms": (self._frame_cost or 0.0) * 1000,
+            }
+
+    def get_memory_usage(self) -> int:
+        """Get the number of bytes held by the frame ring"""
+        with self._lock:
+            return self._ring.get_memory_usage()
+
+    def _accept_frame(self) -> bool:
+        """Decide whether a decoded frame is shown, called for every frame before it is mapped"""
+        with self._lock:
+            self._decoded += 1
+            now = time.perf_counter()
+            # A little slack, so a video at the cap rate is not halved by timer jitter
+            if (self._paused or self._pending or self._layout is None or self._decoded % self._decimation
+                    or now - self._last_frame_time < self._frame_interval * 0.9):
+                self._dropped += 1
+                return False
+
+            self._last_frame_time = now
+            return True
+
+    def _on_frame(self, image: QImage, bottom_up: bool = False):
+        """Compose a mapped frame into the ring, mirroring frames stored bottom to top"""
+        with self._lock:
+            if image.isNull() or self._layout is None:
+                return
+
+            with tracer.span("video frame", width=image.width(), height=image.height()):
+                start = time.perf_counter()
+                self._ring.configure(*self._layout, image.size())
+                self._ring.write(image, bottom_up)
+                self._compose_time = time.perf_counter() - start
+
+            self._pending = True
+            self._shown += 1
+
+        self.frameReady.emit()
+
+    def _on_media_status_changed(self, status):
+        if status == QMediaPlayer.EndOfMedia and not self._paused:
+            # Loop like a live wallpaper
+            self._player.setPosition(0)
+            self._player.play()
+        elif status == QMediaPlayer.InvalidMedia:
+            logger.error(f"Failed to play video background {self._source}: {self._player.errorString()}")
@@ -1,9 +1,12 @@
 # coding:utf-8
 import sys
+from pathlib import Path
 from qfluentwidgets import (qconfig, QConfig, ConfigItem, OptionsConfigItem, 
                             OptionsValidator, Theme, ColorConfigItem, EnumSerializer, 
                             BoolValidator, RangeConfigItem, RangeValidator)
 
+from .config_writer import configWriter
+
 
 
 
@@ -38,6 +41,77 @@ class Config(QConfig):
         "Background", "DisplayMode", "Keep Aspect Ratio", 
         OptionsValidator(["Stretch", "Keep Aspect Ratio", "Tile", "Original Size", "Fit Window"])
     )
+    backgroundThemeAdaptive = ConfigItem("Background", "ThemeAdaptive", False, BoolValidator())
+    backgroundGalleryFolder = ConfigItem("Background", "GalleryFolder", "")
+    backgroundIdleTrimTimeout = RangeConfigItem("Background", "IdleTrimTimeout", 120, RangeValidator(0, 3600))
+    backgroundSharedCache = ConfigItem("Background", "SharedCache", False, BoolValidator())
+    backgroundVideoFrameRate = RangeConfigItem("Background", "VideoFrameRate", 30, RangeValidator(1, 60))
+    
+    # diagnostics
+    traceEnabled = ConfigItem("Diagnostics", "TraceEnabled", False, BoolValidator())
+    
+    def __init__(self):
+        super().__init__()
+        self._loadFuture = None
+    
+    def loadAsync(self, file):
+        """ Start reading the config file on a background thread
+        
+        The values are applied on first access, so the read overlaps with the rest of the startup.
+        """
+        self.file = Path(file)
+        self._loadFuture = configWriter.read(self.file)
+        
+        # register to the global qconfig like `qconfig.load` does
+        qconfig._cfg = self
+        self.themeChanged.connect(qconfig.themeChanged)
+    
+    def ensureLoaded(self):
+        """ Wait for the config file read by `loadAsync` and apply its values """
+        if self._loadFuture is None:
+            return
+        
+        future, self._loadFuture = self._loadFuture, None
+        values = future.result()
+        
+        # map config items' key to item
+        items = {}
+        for name in dir(self.__class__):
+            item = getattr(self.__class__, name)
+            if isinstance(item, ConfigItem):
+                items[item.key] = item
+        
+        # update the value of config item
+        for k, v in values.items():
+            if not isinstance(v, dict) and items.get(k) is not None:
+                items[k].deserializeFrom(v)
+            elif isinstance(v, dict):
+                for key, value in v.items():
+                    key = k + "." + key
+                    if items.get(key) is not None:
+                        items[key].deserializeFrom(value)
+        
+        qconfig.theme = self.get(self.themeMode)
+    
+    def get(self, item):
+        self.ensureLoaded()
+        return super().get(item)
+    
+    def set(self, item, value, save=True, copy=True):
+        self.ensureLoaded()
+        super().set(item, value, save, copy)
+    
+    def toDict(self, serialize=True):
+        self.ensureLoaded()
+        return super().toDict(serialize)
+    
+    def save(self):
+        """ Save config, batched and written atomically on a background thread """
+        configWriter.save(self.file, self.toDict())
+    
+    def flush(self):
+        """ Write pending changes to the config file now """
+        configWriter.flush()
 
 
 # Create global config instance
@@ -53,5 +127,8 @@ AUTHOR = "PyQt-Fluent-Widgets"
 VERSION = "1.0.0"
 YEAR = 2024
 
-# Load configuration
-qconfig.load('config/config.json', cfg) 
\ No newline at end of file
+# Load configuration in the background
+cfg.loadAsync('config/config.json')
+
+# setting cards of qfluentwidgets save through the global qconfig, batch those writes too
+qconfig.save = cfg.save 
\ No newline at end of file
@@ -0,0 +1,124 @@
+# coding: utf-8
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigWriter:
+    """ Config writer, saves json files atomically on a background thread
+
+    Saves requested in quick succession are batched: only the latest content of each file
+    is written, once no new save has arrived for `delay` seconds (at most `maxDelay` after
+    the first unsaved change).
+    """
+
+    def __init__(self, delay=0.5, maxDelay=2.0):
+        self.delay = delay
+        self.maxDelay = maxDelay
+        self._condition = threading.Condition()
+        self._pending = {}          # path -> content to write
+        self._firstDirtyTime = 0
+        self._lastDirtyTime = 0
+        self._isWriting = False
+        self._isFlushing = False
+        self._thread = None
+
+    def save(self, path, content: dict):
+        """ schedule writing `content` to the json file at `path` """
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._firstDirtyTime = now
+
+            self._pending[str(path)] = content
+            self._lastDirtyTime = now
+            self._ensureThread()
+            self._condition.notify_all()
+
+    def flush(self, timeout=5.0) -> bool:
+        """ write all pending changes now and wait for them, returns `False` on timeout """
+        with self._condition:
+            if not self._pending and not self._isWriting:
+                return True
+
+            self._isFlushing = True
+            self._ensureThread()
+            self._condition.notify_all()
+            isDone = self._condition.wait_for(
+                lambda: not self._pending and not self._isWriting, timeout)
+            self._isFlushing = False
+
+        return isDone
+
+    def read(self, path) -> Future:
+        """ read a json file on a background thread, the future resolves to `{}` on error """
+        future = Future()
+
+        def run():
+            try:
+                with open(path, encoding="utf-8") as f:
+                    future.set_result(json.load(f))
+            except (OSError, ValueError):
+                future.set_result({})
+
+        threading.Thread(target=run, name="ConfigReader", daemon=True).start()
+        return future
+
+    def _ensureThread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ConfigWriter", daemon=True)
+            self._thread.start()
+
+    def _dueTime(self):
+        return min(self._lastDirtyTime + self.delay, self._firstDirtyTime + self.maxDelay)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+
+                remaining = self._dueTime() - time.monotonic()
+                if remaining > 0 and not self._isFlushing:
+                    self._condition.wait(remaining)
+                    continue
+
+                pending, self._pending = self._pending, {}
+                self._isWriting = True
+
+            try:
+                for path, content in pending.items():
+                    self._write(path, content)
+            finally:
+                with self._condition:
+                    self._isWriting = False
+                    self._condition.notify_all()
+
+    def _write(self, path: str, content: dict):
+        """ write the file atomically (temp file plus rename) """
+        tempPath = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(tempPath, "w", encoding="utf-8") as f:
+                json.dump(content, f, ensure_ascii=False, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+
+            os.replace(tempPath, path)
+        except Exception as e:
+            # Unserializable values fail here too, the thread must keep serving later saves
+            logger.error(f"Failed to save config file {path}: {str(e)}")
+            try:
+                os.remove(tempPath)
+            except OSError:
+                pass
+
+
+configWriter = ConfigWriter()
+atexit.register(configWriter.flush)
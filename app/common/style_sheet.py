@@ -1,13 +1,123 @@
 # coding: utf-8
+import os
+import json
 from enum import Enum
+from PyQt5.QtCore import QObject, QFileSystemWatcher
 from qfluentwidgets import StyleSheetBase, Theme, isDarkTheme, qconfig
+from qfluentwidgets.common.style_sheet import getStyleSheetFromFile, updateStyleSheet
+
+
+def fileStamp(path: str):
+    """ modification time and size of a file, `None` if it does not exist """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class StyleSheetRegistry(QObject):
+    """ Style sheet registry, reads each qss file once and keeps its content in memory """
+
+    BUNDLE_PATH = "app/resource/qss_bundle.json"
+
+    def __init__(self, bundlePath=BUNDLE_PATH, parent=None):
+        super().__init__(parent)
+        self.bundlePath = bundlePath
+        self._contents = {}
+        self._watcher = None
+
+    def content(self, path: str) -> str:
+        """ get the content of a qss file, reading it only on first use """
+        qss = self._contents.get(path)
+        if qss is None:
+            qss = getStyleSheetFromFile(path)
+            self._contents[path] = qss
+            self._watch(path)
+
+        return qss
+
+    def preload(self) -> bool:
+        """ load the qss of all themes from the bundle file, so later lookups skip file I/O
+
+        Files edited since the bundle was built are read from disk on first use instead.
+        """
+        try:
+            with open(self.bundlePath, encoding='utf-8') as f:
+                bundle = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        for path, entry in bundle.items():
+            if isinstance(entry, dict) and entry.get("stamp") == fileStamp(path):
+                self._contents.setdefault(path, entry.get("qss"))
+
+        return True
+
+    def setWatchEnabled(self, isEnabled: bool):
+        """ reload qss files and restyle the widgets when a file is edited, for development """
+        if not isEnabled:
+            if self._watcher:
+                self._watcher.deleteLater()
+                self._watcher = None
+            return
+
+        if self._watcher:
+            return
+
+        # contents preloaded from the bundle may be stale, read the files again
+        self._contents.clear()
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._onFileChanged)
+
+    def clear(self):
+        """ drop all cached qss """
+        self._contents.clear()
+
+    def _watch(self, path: str):
+        if self._watcher and os.path.exists(path) and path not in self._watcher.files():
+            self._watcher.addPath(path)
+
+    def _onFileChanged(self, path: str):
+        self._contents.pop(path, None)
+
+        # editors usually replace the file on save, which removes it from the watcher
+        self._watch(path)
+        updateStyleSheet()
+
+
+styleSheetRegistry = StyleSheetRegistry()
 
 
 class StyleSheet(StyleSheetBase, Enum):
     """ Style sheet """
-    
+
     SETTING_INTERFACE = "setting_interface"
-    
+
     def path(self, theme=Theme.AUTO):
         theme = qconfig.theme if theme == Theme.AUTO else theme
-        return f"app/resource/{theme.value.lower()}/{self.value}.qss" 
\ No newline at end of file
+        return f"app/resource/{theme.value.lower()}/{self.value}.qss"
+
+    def content(self, theme=Theme.AUTO):
+        return styleSheetRegistry.content(self.path(theme))
+
+
+def buildStyleSheetBundle(path=StyleSheetRegistry.BUNDLE_PATH):
+    """ write the qss of every style sheet and theme into a single bundle file """
+    bundle = {}
+    for styleSheet in StyleSheet:
+        for theme in (Theme.LIGHT, Theme.DARK):
+            file = styleSheet.path(theme)
+            bundle[file] = {"stamp": fileStamp(file), "qss": getStyleSheetFromFile(file)}
+
+    tempPath = f"{path}.tmp"
+    with open(tempPath, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, indent=4)
+
+    os.replace(tempPath, path)
+    return path
+
+
+if __name__ == '__main__':
+    print(f"Style sheet bundle written to {buildStyleSheetBundle()}")
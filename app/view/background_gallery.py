@@ -0,0 +1,192 @@
+# coding:utf-8
+import os
+
+from qfluentwidgets import PushButton, SettingCard
+from qfluentwidgets import FluentIcon as FIF
+from PyQt5.QtCore import Qt, QSize, QTimer, QModelIndex, QAbstractListModel, pyqtSignal
+from PyQt5.QtGui import QColor, QPixmap
+from PyQt5.QtWidgets import QWidget, QListView, QVBoxLayout, QFileDialog
+
+from ..common import cfg
+from ..background import ThumbnailLoader
+
+
+class ThumbnailModel(QAbstractListModel):
+    """ List model of the images in the gallery folder, thumbnails are loaded lazily """
+
+    def __init__(self, loader: ThumbnailLoader, parent=None):
+        super().__init__(parent)
+        self.loader = loader
+        self._paths = []
+        self._rows = {}
+
+        size = loader.thumbnail_size
+        self._placeholder = QPixmap(size)
+        self._placeholder.fill(QColor(128, 128, 128, 40))
+
+        self.loader.thumbnailReady.connect(self._onThumbnailReady)
+
+    def setPaths(self, paths: list):
+        """ Replace the listed images """
+        self.beginResetModel()
+        self._paths = list(paths)
+        self._rows = {path: row for row, path in enumerate(self._paths)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        path = self._paths[index.row()]
+        if role == Qt.DecorationRole:
+            # only called for visible items, so thumbnails are requested on demand
+            return self.loader.thumbnail(path) or self._placeholder
+        if role in (Qt.ToolTipRole, Qt.AccessibleTextRole):
+            return os.path.basename(path)
+        if role == Qt.UserRole:
+            return path
+
+        return None
+
+    def _onThumbnailReady(self, path: str):
+        row = self._rows.get(path)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class ThumbnailGalleryView(QListView):
+    """ Virtualized thumbnail grid with hover preview """
+
+    # Emitted with the hovered image path, or an empty string when nothing is hovered
+    hoverChanged = pyqtSignal(str)
+
+    # Emitted with the clicked image path
+    imageSelected = pyqtSignal(str)
+
+    HOVER_DELAY = 150   # Milliseconds to rest on a thumbnail before previewing it
+
+    def __init__(self, model: ThumbnailModel, parent=None):
+        super().__init__(parent)
+        self._hoverPath = ""
+        self._pendingHoverPath = ""
+        self.hoverTimer = QTimer(self)
+        self.hoverTimer.setSingleShot(True)
+        self.hoverTimer.setInterval(self.HOVER_DELAY)
+
+        thumbnailSize = model.loader.thumbnail_size
+        self.setModel(model)
+        self.setViewMode(QListView.IconMode)
+        self.setIconSize(thumbnailSize)
+        self.setGridSize(thumbnailSize + QSize(12, 12))
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(200)
+        self.setSelectionMode(QListView.SingleSelection)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.setObjectName('galleryView')
+
+        self.entered.connect(self._onEntered)
+        self.clicked.connect(self._onClicked)
+        self.hoverTimer.timeout.connect(self._emitHover)
+
+    def mouseMoveEvent(self, e):
+        super().mouseMoveEvent(e)
+        if not self.indexAt(e.pos()).isValid():
+            self._setHoverPath("")
+
+    def leaveEvent(self, e):
+        super().leaveEvent(e)
+        self._setHoverPath("")
+
+    def _onEntered(self, index: QModelIndex):
+        self._setHoverPath(index.data(Qt.UserRole) or "")
+
+    def _onClicked(self, index: QModelIndex):
+        path = index.data(Qt.UserRole)
+        if path:
+            self.hoverTimer.stop()
+            self._pendingHoverPath = self._hoverPath = ""
+            self.imageSelected.emit(path)
+
+    def _setHoverPath(self, path: str):
+        self._pendingHoverPath = path
+        if not path:
+            # leaving restores the background at once
+            self.hoverTimer.stop()
+            self._emitHover()
+        else:
+            self.hoverTimer.start()
+
+    def _emitHover(self):
+        if self._pendingHoverPath != self._hoverPath:
+            self._hoverPath = self._pendingHoverPath
+            self.hoverChanged.emit(self._hoverPath)
+
+
+class BackgroundGalleryCard(QWidget):
+    """ Setting card listing the images of a folder as background candidates """
+
+    # Emitted with the hovered image path, or an empty string when the hover ends
+    previewRequested = pyqtSignal(str)
+
+    # Emitted with the image path chosen as background
+    imageSelected = pyqtSignal(str)
+
+    def __init__(self, title, content, icon, parent=None):
+        super().__init__(parent)
+        self.vBoxLayout = QVBoxLayout(self)
+        self.headerCard = SettingCard(icon, title, content, self)
+        self.folderButton = PushButton(self.tr('Choose folder'), self.headerCard)
+
+        self.loader = ThumbnailLoader(parent=self)
+        self.model = ThumbnailModel(self.loader, self)
+        self.galleryView = ThumbnailGalleryView(self.model, self)
+
+        self.headerCard.hBoxLayout.addWidget(self.folderButton, 0, Qt.AlignRight)
+        self.headerCard.hBoxLayout.addSpacing(16)
+
+        self.galleryView.setFixedHeight(3 * self.galleryView.gridSize().height() + 8)
+        self.vBoxLayout.setContentsMargins(0, 0, 0, 0)
+        self.vBoxLayout.setSpacing(0)
+        self.vBoxLayout.addWidget(self.headerCard)
+        self.vBoxLayout.addWidget(self.galleryView)
+
+        self.folderButton.clicked.connect(self._onChooseFolder)
+        self.loader.folderScanned.connect(self._onFolderScanned)
+        self.galleryView.hoverChanged.connect(self.previewRequested)
+        self.galleryView.imageSelected.connect(self.imageSelected)
+
+        self.setFolder(cfg.get(cfg.backgroundGalleryFolder))
+
+    def setFolder(self, folder: str):
+        """ Scan a folder and show its images """
+        self.model.setPaths([])
+        if folder:
+            self.headerCard.setContent(self.tr('Scanning ') + folder)
+        else:
+            self.headerCard.setContent(self.tr('Choose a folder to browse background images'))
+
+        self.loader.scan_folder(folder)
+
+    def _onChooseFolder(self):
+        folder = QFileDialog.getExistingDirectory(
+            self, self.tr('Choose background folder'), cfg.get(cfg.backgroundGalleryFolder))
+        if not folder:
+            return
+
+        cfg.set(cfg.backgroundGalleryFolder, folder)
+        self.setFolder(folder)
+
+    def _onFolderScanned(self, paths: list):
+        folder = cfg.get(cfg.backgroundGalleryFolder)
+        self.model.setPaths(paths)
+        if folder:
+            self.headerCard.setContent(self.tr('{0} images in {1}').format(len(paths), folder))
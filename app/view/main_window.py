@@ -1,6 +1,8 @@
 # coding:utf-8
-from PyQt5.QtCore import Qt, QSize, QUrl
-from PyQt5.QtGui import QIcon, QDesktopServices, QPainter
+import time
+
+from PyQt5.QtCore import Qt, QSize, QUrl, QVariantAnimation, QEvent
+from PyQt5.QtGui import QIcon, QDesktopServices, QPainter, QImage
 from PyQt5.QtWidgets import QApplication
 
 from qfluentwidgets import (FluentWindow, NavigationItemPosition, MessageBox, 
@@ -10,12 +12,15 @@ from qfluentwidgets import FluentIcon as FIF
 
 from .settings_interface import SettingInterface
 from ..common import cfg
-from ..background import get_background_manager
+from ..background import (get_background_manager, MemoryTrimPolicy, tracer, traced,
+                          pixel_formats)
 
 
 class MainWindow(FluentWindow):
     """ Main window """
     
+    BACKGROUND_FADE_DURATION = 250  # Milliseconds of the cross-fade between page backgrounds
+    
     def __init__(self):
         super().__init__()
         self.initWindow()
@@ -28,6 +33,24 @@ class MainWindow(FluentWindow):
         
         # initialize background manager
         self.backgroundManager = get_background_manager(cfg)
+        self.backgroundManager.set_shared_cache_enabled(cfg.get(cfg.backgroundSharedCache))
+        self.backgroundManager.set_video_frame_rate(cfg.get(cfg.backgroundVideoFrameRate))
+        
+        # record paint and render spans, tracing may also have been enabled by BACKGROUND_TRACE
+        if cfg.get(cfg.traceEnabled):
+            tracer.set_enabled(True)
+        
+        # drop background renders while idle, hidden or minimized
+        self.memoryPolicy = MemoryTrimPolicy(
+            self.backgroundManager, self, cfg.get(cfg.backgroundIdleTrimTimeout))
+        
+        # cross-fade the background when switching to a page with another background profile
+        self._lastBackground = None     # (pixmap, opacity, display mode) of the last paint
+        self._fadingBackground = None   # background of the previous page while fading out
+        self.backgroundFadeAni = QVariantAnimation(self)
+        self.backgroundFadeAni.setStartValue(0.0)
+        self.backgroundFadeAni.setEndValue(1.0)
+        self.backgroundFadeAni.setDuration(self.BACKGROUND_FADE_DURATION)
         
         # enable acrylic effect
         self.navigationInterface.setAcrylicEnabled(True)
@@ -45,13 +68,23 @@ class MainWindow(FluentWindow):
         
         # add items to navigation interface
         self.initNavigation()
+        self._updateBackgroundRoute()
         
         # start theme listener
         self.themeListener.start()
     
     def connectSignalToSlot(self):
         """ Connect signal to slot """
-        pass
+        # repaint when the background changes, e.g. while previewing gallery images
+        self.backgroundManager.backgroundChanged.connect(self.update)
+        self.backgroundManager.videoFrameReady.connect(self.update)
+        cfg.backgroundIdleTrimTimeout.valueChanged.connect(self.memoryPolicy.set_idle_timeout)
+        cfg.backgroundSharedCache.valueChanged.connect(self.backgroundManager.set_shared_cache_enabled)
+        cfg.backgroundVideoFrameRate.valueChanged.connect(self.backgroundManager.set_video_frame_rate)
+        cfg.traceEnabled.valueChanged.connect(tracer.set_enabled)
+        self.backgroundFadeAni.valueChanged.connect(lambda: self.update())
+        self.backgroundFadeAni.finished.connect(self._onBackgroundFadeFinished)
+        self.backgroundManager.rendersReleased.connect(self._onBackgroundRendersReleased)
     
     def initNavigation(self):
         """ Initialize navigation """
@@ -118,54 +151,142 @@ class MainWindow(FluentWindow):
         if hasattr(self, 'splashScreen'):
             self.splashScreen.resize(self.size()) 
     
+    def showEvent(self, e):
+        super().showEvent(e)
+        if hasattr(self, 'backgroundManager'):
+            self.backgroundManager.set_video_paused(self.isMinimized())
+    
+    def hideEvent(self, e):
+        super().hideEvent(e)
+        if hasattr(self, 'backgroundManager'):
+            self.backgroundManager.set_video_paused(True)
+    
+    def changeEvent(self, e):
+        super().changeEvent(e)
+        if e.type() == QEvent.WindowStateChange and hasattr(self, 'backgroundManager'):
+            # a minimized window is never painted, a playing video would only drop frames
+            self.backgroundManager.set_video_paused(self.isMinimized() or not self.isVisible())
+    
+    def _onCurrentInterfaceChanged(self, index: int):
+        super()._onCurrentInterfaceChanged(index)
+        self._updateBackgroundRoute()
+    
+    def _updateBackgroundRoute(self):
+        """ Show the background profile of the current page and prepare the neighbouring pages """
+        index = self.stackedWidget.currentIndex()
+        if index < 0:
+            return
+        
+        routes = [self.stackedWidget.widget(i).objectName() for i in range(self.stackedWidget.count())]
+        previousRoute = self.backgroundManager.get_current_route()
+        previousProfile = self.backgroundManager.get_profile()
+        neighbours = [routes[i] for i in (index - 1, index + 1) if 0 <= i < len(routes)]
+        self.backgroundManager.set_route(routes[index], neighbours)
+        
+        isProfileChanged = self.backgroundManager.get_profile() is not previousProfile
+        if self._lastBackground and routes[index] != previousRoute and isProfileChanged:
+            self._fadingBackground = self._lastBackground
+            self.backgroundFadeAni.stop()
+            self.backgroundFadeAni.start()
+        
+        self.update()
+    
+    def _onBackgroundFadeFinished(self):
+        self._fadingBackground = None
+        self.update()
+    
+    def _onBackgroundRendersReleased(self):
+        # pixmaps backed by shared memory become invalid once the manager releases them
+        self.backgroundFadeAni.stop()
+        self._lastBackground = None
+        self._fadingBackground = None
+    
+    @traced("paintEvent", "paint")
     def paintEvent(self, event):
         """ Paint event - draw background image if enabled """
         super().paintEvent(event)
         
-        # Draw background image if enabled
-        if hasattr(self, 'backgroundManager') and self.backgroundManager.is_background_enabled():
-            painter = QPainter(self)
-            painter.setRenderHint(QPainter.Antialiasing)
-            
-            # Get background pixmap
-            window_size = self.size()
-            background_pixmap = self.backgroundManager.get_background_pixmap(window_size)
+        if not hasattr(self, 'backgroundManager'):
+            return
+        
+        # Get background pixmap of the current page, or the current frame of a video background
+        start = time.perf_counter()
+        window_size = self.size()
+        background = None
+        isVideo = self.backgroundManager.is_video_background()
+        if not isVideo or not self.backgroundManager.is_background_enabled():
+            self.backgroundManager.stop_video()
+        
+        if self.backgroundManager.is_background_enabled():
+            if isVideo:
+                background_pixmap = self.backgroundManager.get_video_frame(window_size, self.devicePixelRatioF())
+            else:
+                background_pixmap = self.backgroundManager.get_background_pixmap(
+                    window_size, self.devicePixelRatioF())
             
             if background_pixmap and not background_pixmap.isNull():
-                # Apply opacity
                 opacity = self.backgroundManager.get_background_opacity() / 100.0  # Convert percentage to float
-                painter.setOpacity(opacity)
-                
-                # Get display mode
                 display_mode = self.backgroundManager.get_background_display_mode()
-                
-                # Draw based on display mode
-                self._draw_background_by_mode(painter, background_pixmap, window_size, display_mode)
-            
-            painter.end()
+                background = (background_pixmap, opacity, display_mode)
+        
+        self._lastBackground = background
+        if background is None and self._fadingBackground is None:
+            return
+        
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # Fade the background of the previous page out while the new one fades in
+        progress = 1.0
+        if self._fadingBackground:
+            progress = self.backgroundFadeAni.currentValue()
+            pixmap, opacity, display_mode = self._fadingBackground
+            painter.setOpacity(opacity * (1 - progress))
+            self._draw_background_by_mode(painter, pixmap, window_size, display_mode)
+        
+        if background:
+            pixmap, opacity, display_mode = background
+            painter.setOpacity(opacity * progress)
+            self._draw_background_by_mode(painter, pixmap, window_size, display_mode)
+        
+        painter.end()
+        
+        # slow paints make the video background show fewer frames
+        if isVideo and background:
+            self.backgroundManager.report_video_paint_time(time.perf_counter() - start)
     
+    @traced("draw background", "paint")
     def _draw_background_by_mode(self, painter, background_pixmap, window_size, display_mode):
         """Draw background image according to display mode
         
         Args:
             painter: QPainter instance
-            background_pixmap: Background image pixmap
+            background_pixmap: Background image pixmap, or QImage frame of a video background
             window_size: Window size
             display_mode: Display mode string
         """
-        pixmap_size = background_pixmap.size()
+        if isinstance(background_pixmap, QImage):
+            # video frames are RGB32 images, converting them to pixmaps would copy every frame
+            draw = painter.drawImage
+        else:
+            # count draws QPainter would have to convert, renders are normalized so this should stay 0
+            pixel_formats.record_paint(background_pixmap)
+            draw = painter.drawPixmap
+        
+        # size in device independent pixels, the pixmap may be rendered for a high DPI screen
+        pixmap_size = background_pixmap.size() / background_pixmap.devicePixelRatio()
         
         if display_mode == "Tile":
             # Tile the image across the window
             for x in range(0, window_size.width(), pixmap_size.width()):
                 for y in range(0, window_size.height(), pixmap_size.height()):
-                    painter.drawPixmap(x, y, background_pixmap)
+                    draw(x, y, background_pixmap)
                     
         elif display_mode == "Original Size":
             # Center the image at original size
             x = max(0, (window_size.width() - pixmap_size.width()) // 2)
             y = max(0, (window_size.height() - pixmap_size.height()) // 2)
-            painter.drawPixmap(x, y, background_pixmap)
+            draw(x, y, background_pixmap)
             
         else:
             # For "Stretch", "Keep Aspect Ratio", "Fit Window" modes
@@ -179,4 +300,4 @@ class MainWindow(FluentWindow):
                 x = max(0, (window_size.width() - pixmap_size.width()) // 2)
                 y = max(0, (window_size.height() - pixmap_size.height()) // 2)
                 
-            painter.drawPixmap(x, y, background_pixmap) 
\ No newline at end of file
+            draw(x, y, background_pixmap) 
\ No newline at end of file
@@ -1,4 +1,5 @@
 # coding:utf-8
+import time
 from qfluentwidgets import (SettingCardGroup, OptionsSettingCard, HyperlinkCard, 
                             PrimaryPushSettingCard, ScrollArea, 
                             ExpandLayout, CustomColorSettingCard, setTheme, 
@@ -11,7 +12,9 @@ from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtWidgets import QWidget, QLabel, QFileDialog, QHBoxLayout
 
 from ..common import cfg, HELP_URL, FEEDBACK_URL, AUTHOR, VERSION, YEAR, isWin11, StyleSheet
-from ..background import get_background_manager
+from ..background import get_background_manager, tracer
+from ..background.video_background import VIDEO_FORMATS, is_available as isVideoAvailable
+from .background_gallery import BackgroundGalleryCard
 
 
 class BackgroundImageCard(SettingCard):
@@ -50,6 +53,32 @@ class BackgroundImageCard(SettingCard):
             self.clearButton.setEnabled(False)
 
 
+class BackgroundRangeSettingCard(RangeSettingCard):
+    """ Range setting card which only saves its value when the slider is released """
+    
+    def __init__(self, configItem, icon, title, content=None, parent=None):
+        super().__init__(configItem, icon, title, content, parent)
+        self.isDragging = False
+        self.slider.sliderPressed.connect(self._onSliderPressed)
+        self.slider.sliderReleased.connect(self._onSliderReleased)
+        
+    def setValue(self, value):
+        if not self.isDragging:
+            super().setValue(value)
+            return
+            
+        # intermediate values are previewed by the listener of valueChanged, not saved
+        self.valueLabel.setNum(value)
+        self.valueLabel.adjustSize()
+        
+    def _onSliderPressed(self):
+        self.isDragging = True
+        
+    def _onSliderReleased(self):
+        self.isDragging = False
+        super().setValue(self.slider.value())
+
+
 class SettingInterface(ScrollArea):
     """ Settings interface """
     
@@ -120,14 +149,20 @@ class SettingInterface(ScrollArea):
             FIF.FOLDER,
             self.backgroundGroup
         )
-        self.backgroundOpacityCard = RangeSettingCard(
+        self.backgroundGalleryCard = BackgroundGalleryCard(
+            self.tr('Background gallery'),
+            self.tr('Choose a folder to browse background images'),
+            FIF.ALBUM,
+            self.backgroundGroup
+        )
+        self.backgroundOpacityCard = BackgroundRangeSettingCard(
             cfg.backgroundOpacity,
             FIF.TRANSPARENT,
             self.tr('Background opacity'),
             self.tr('Adjust the opacity of the background image (0-100%)'),
             self.backgroundGroup
         )
-        self.backgroundBlurCard = RangeSettingCard(
+        self.backgroundBlurCard = BackgroundRangeSettingCard(
             cfg.backgroundBlurRadius,
             FIF.BRUSH,
             self.tr('Background blur'),
@@ -145,6 +180,30 @@ class SettingInterface(ScrollArea):
             ],
             parent=self.backgroundGroup
         )
+        self.backgroundThemeAdaptiveCard = SwitchSettingCard(
+            FIF.CONSTRACT,
+            self.tr('Adapt to theme'),
+            self.tr('Darken the background in dark mode and lighten it in light mode'),
+            cfg.backgroundThemeAdaptive,
+            self.backgroundGroup
+        )
+        
+        # diagnostics
+        self.diagnosticsGroup = SettingCardGroup(self.tr('Diagnostics'), self.scrollWidget)
+        self.traceEnabledCard = SwitchSettingCard(
+            FIF.STOP_WATCH,
+            self.tr('Performance trace'),
+            self.tr('Record where paint and background rendering time goes'),
+            cfg.traceEnabled,
+            self.diagnosticsGroup
+        )
+        self.exportTraceCard = PushSettingCard(
+            self.tr('Export'),
+            FIF.SAVE_AS,
+            self.tr('Export trace'),
+            self.tr('Save the recorded spans for chrome://tracing or ui.perfetto.dev'),
+            self.diagnosticsGroup
+        )
         
         # about
         self.aboutGroup = SettingCardGroup(self.tr('About'), self.scrollWidget)
@@ -206,11 +265,16 @@ class SettingInterface(ScrollArea):
         # Add widgets to expand card view instead of as setting cards
         self.backgroundGroup.viewLayout.addWidget(self.backgroundEnabledCard)
         self.backgroundGroup.viewLayout.addWidget(self.backgroundImageCard)  
+        self.backgroundGroup.viewLayout.addWidget(self.backgroundGalleryCard)
         self.backgroundGroup.viewLayout.addWidget(self.backgroundOpacityCard)
         self.backgroundGroup.viewLayout.addWidget(self.backgroundBlurCard)
         self.backgroundGroup.viewLayout.addWidget(self.backgroundDisplayModeCard)
+        self.backgroundGroup.viewLayout.addWidget(self.backgroundThemeAdaptiveCard)
         self.backgroundGroup._adjustViewSize()
         
+        self.diagnosticsGroup.addSettingCard(self.traceEnabledCard)
+        self.diagnosticsGroup.addSettingCard(self.exportTraceCard)
+        
         self.aboutGroup.addSettingCard(self.helpCard)
         self.aboutGroup.addSettingCard(self.feedbackCard)
         
@@ -219,6 +283,7 @@ class SettingInterface(ScrollArea):
         self.expandLayout.setContentsMargins(36, 10, 36, 0)
         self.expandLayout.addWidget(self.personalGroup)
         self.expandLayout.addWidget(self.backgroundGroup)
+        self.expandLayout.addWidget(self.diagnosticsGroup)
         self.expandLayout.addWidget(self.aboutGroup)
     
 
@@ -238,9 +303,17 @@ class SettingInterface(ScrollArea):
         self.backgroundEnabledCard.checkedChanged.connect(self.__onBackgroundEnabledChanged)
         self.backgroundImageCard.selectButton.clicked.connect(self.__onSelectBackgroundImage)
         self.backgroundImageCard.clearButton.clicked.connect(self.__onClearBackgroundImage)
+        self.backgroundGalleryCard.previewRequested.connect(self.__onBackgroundPreviewRequested)
+        self.backgroundGalleryCard.imageSelected.connect(self.__onGalleryImageSelected)
         self.backgroundOpacityCard.valueChanged.connect(self.__onBackgroundOpacityChanged)
+        self.backgroundOpacityCard.slider.sliderReleased.connect(self.backgroundManager.commit_preview)
         self.backgroundBlurCard.valueChanged.connect(self.__onBackgroundBlurChanged)
+        self.backgroundBlurCard.slider.sliderReleased.connect(self.backgroundManager.commit_preview)
         self.backgroundDisplayModeCard.comboBox.currentIndexChanged.connect(self.__onBackgroundDisplayModeChanged)
+        self.backgroundThemeAdaptiveCard.checkedChanged.connect(self.__onBackgroundThemeAdaptiveChanged)
+        
+        # diagnostics
+        self.exportTraceCard.clicked.connect(self.__onExportTrace)
         
         # about
         self.feedbackCard.clicked.connect(
@@ -253,6 +326,32 @@ class SettingInterface(ScrollArea):
         if hasattr(parent_window, 'setMicaEffectEnabled'):
             parent_window.setMicaEffectEnabled(isChecked)
     
+    def __onExportTrace(self):
+        """ Handle exporting the recorded performance trace """
+        if not len(tracer):
+            InfoBar.warning(
+                self.tr('Nothing to export'),
+                self.tr('Enable the performance trace and use the application first'),
+                duration=3000,
+                parent=self.window()
+            )
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            self.tr('Export trace'),
+            f"background-trace-{time.strftime('%Y%m%d-%H%M%S')}.json",
+            self.tr('Trace files (*.json)')
+        )
+        
+        if file_path and tracer.dump(file_path):
+            InfoBar.success(
+                self.tr('Trace exported'),
+                self.tr('{} spans saved').format(len(tracer)),
+                duration=3000,
+                parent=self.window()
+            )
+    
     def __onBackgroundEnabledChanged(self, isChecked: bool):
         """ Handle background image enable/disable """
         cfg.set(cfg.backgroundImageEnabled, isChecked)
@@ -262,11 +361,16 @@ class SettingInterface(ScrollArea):
     
     def __onSelectBackgroundImage(self):
         """ Handle background image selection """
+        filters = self.tr('Image files (*.jpg *.jpeg *.png *.bmp *.gif *.webp)')
+        if isVideoAvailable():
+            videoPatterns = ' '.join(f'*{suffix}' for suffix in sorted(VIDEO_FORMATS))
+            filters += ';;' + self.tr('Video files') + f' ({videoPatterns})'
+        
         file_path, _ = QFileDialog.getOpenFileName(
             self,
             self.tr('Select background image'),
             '',
-            self.tr('Image files (*.jpg *.jpeg *.png *.bmp *.gif *.webp)')
+            filters
         )
         
         if file_path:
@@ -275,6 +379,19 @@ class SettingInterface(ScrollArea):
             self.backgroundImageCard._updateDisplay()
             self.__updateBackgroundPreview()
     
+    def __onBackgroundPreviewRequested(self, file_path: str):
+        """ Handle hovering a gallery thumbnail """
+        if file_path:
+            self.backgroundManager.begin_preview(low_resolution=True, image_path=file_path)
+        else:
+            self.backgroundManager.rollback_preview()
+    
+    def __onGalleryImageSelected(self, file_path: str):
+        """ Handle choosing a background image from the gallery """
+        self.backgroundManager.begin_preview(image_path=file_path)
+        self.backgroundManager.commit_preview()
+        self.backgroundImageCard._updateDisplay()
+    
     def __onClearBackgroundImage(self):
         """ Handle background image clearing """
         cfg.set(cfg.backgroundImagePath, "")
@@ -284,15 +401,22 @@ class SettingInterface(ScrollArea):
     
     def __onBackgroundOpacityChanged(self, value: int):
         """ Handle background opacity change """
-        cfg.set(cfg.backgroundOpacity, value)
-        self.backgroundManager.update_background()
-        self.__updateBackgroundPreview()
+        if self.backgroundOpacityCard.isDragging:
+            # preview while dragging, the value is committed when the slider is released
+            self.backgroundManager.begin_preview(opacity=value)
+        else:
+            cfg.set(cfg.backgroundOpacity, value)
+            self.__updateBackgroundPreview()
     
     def __onBackgroundBlurChanged(self, value: int):
         """ Handle background blur radius change """
-        cfg.set(cfg.backgroundBlurRadius, value)
-        self.backgroundManager.update_background()
-        self.__updateBackgroundPreview()
+        if self.backgroundBlurCard.isDragging:
+            # every step is a new blur, preview it at low resolution while dragging;
+            # the full render is made once the value is committed on release
+            self.backgroundManager.begin_preview(low_resolution=True, blur_radius=value)
+        else:
+            cfg.set(cfg.backgroundBlurRadius, value)
+            self.__updateBackgroundPreview()
     
     def __onBackgroundDisplayModeChanged(self, index: int):
         """ Handle background display mode change """
@@ -301,6 +425,12 @@ class SettingInterface(ScrollArea):
         self.backgroundManager.update_background()
         self.__updateBackgroundPreview()
     
+    def __onBackgroundThemeAdaptiveChanged(self, isChecked: bool):
+        """ Handle background theme adaptation toggle """
+        # theme variants have their own cache keys, so cached renders stay valid
+        cfg.set(cfg.backgroundThemeAdaptive, isChecked)
+        self.__updateBackgroundPreview()
+    
     def __updateBackgroundPreview(self):
         """ Update background preview in main window """
         parent_window = self.window()
@@ -313,9 +443,11 @@ class SettingInterface(ScrollArea):
         
         # Enable/disable background related cards based on background enabled state
         self.backgroundImageCard.setEnabled(is_background_enabled)
+        self.backgroundGalleryCard.setEnabled(is_background_enabled)
         self.backgroundOpacityCard.setEnabled(is_background_enabled)
         self.backgroundBlurCard.setEnabled(is_background_enabled)
         self.backgroundDisplayModeCard.setEnabled(is_background_enabled)
+        self.backgroundThemeAdaptiveCard.setEnabled(is_background_enabled)
         
         # Update display when background is enabled/disabled
         if hasattr(self.backgroundImageCard, '_updateDisplay'):
@@ -0,0 +1,102 @@
+# coding:utf-8
+"""
+Benchmark the multi-core tiled blur against the Qt scale-down blur and thread count, and check that
+stripes stitch without seams. The render pipeline only uses the tiled blur from
+`tiled_blur.REDUCED_RADIUS * tiled_blur.MIN_REDUCTION` pixels, where it is faster than the Qt blur.
+
+Example:
+    python benchmark_blur.py --size 7680x4320 --radius 20 --threads 1 2 4 8
+"""
+import sys
+import time
+import argparse
+
+from PyQt5.QtGui import QImage, QPainter, QLinearGradient, QColor
+from PyQt5.QtCore import Qt
+
+from app.background import tiled_blur
+from app.background.background_manager import BackgroundManager
+
+
+def parseSize(text):
+    """ parse a `WIDTHxHEIGHT` image size """
+    try:
+        width, height = text.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{text}', expected WIDTHxHEIGHT")
+
+
+def createTestImage(width, height):
+    """ create a detailed test image, gradients plus a sharp grid """
+    image = QImage(width, height, QImage.Format_RGB32)
+    gradient = QLinearGradient(0, 0, width, height)
+    gradient.setColorAt(0, QColor(30, 80, 200))
+    gradient.setColorAt(1, QColor(240, 160, 40))
+
+    painter = QPainter(image)
+    painter.fillRect(image.rect(), gradient)
+    painter.setPen(Qt.white)
+    for x in range(0, width, 97):
+        painter.drawLine(x, 0, x, height)
+    for y in range(0, height, 89):
+        painter.drawLine(0, y, width, y)
+    painter.end()
+    return image
+
+
+def timeBlur(blur, repeat):
+    """ get the best time of `repeat` calls of `blur` in seconds, and the last result """
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = blur()
+        best = min(best, time.perf_counter() - start)
+
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the multi-core tiled background blur against the Qt blur")
+    parser.add_argument("--size", type=parseSize, nargs="+", default=[(7680, 4320)],
+                        help="image sizes, e.g. 7680x4320 or 10240x1440")
+    parser.add_argument("--radius", type=int, nargs="+", default=[20], help="blur radii in pixels")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="thread counts to compare (default: powers of two up to the CPU cores)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement, the best is kept")
+    args = parser.parse_args(argv)
+
+    if not tiled_blur.is_available():
+        print("NumPy is not installed, the tiled blur is unavailable", file=sys.stderr)
+        return 1
+
+    threads = args.threads
+    if not threads:
+        cores = tiled_blur.get_max_threads()
+        threads = sorted({1 << i for i in range(cores.bit_length())} | {cores})
+
+    print(f"{tiled_blur.get_max_threads()} CPU cores available")
+    isSeamless = True
+    for width, height in args.size:
+        image = createTestImage(width, height)
+        for radius in args.radius:
+            used = "tiled" if tiled_blur.is_used_for(radius) else "Qt"
+            print(f"{width}x{height} radius={radius}, the render pipeline uses the {used} blur")
+
+            # Baseline: the scale-down blur used without NumPy and below the threshold
+            baseline, _ = timeBlur(lambda: BackgroundManager._scaled_blur(image, radius), args.repeat)
+            print(f"  Qt scaled    {baseline * 1000:8.1f} ms")
+
+            _, reference = timeBlur(lambda: tiled_blur.blur_image_reduced(image, radius, 1), 1)
+            for count in threads:
+                elapsed, result = timeBlur(lambda: tiled_blur.blur_image_reduced(image, radius, count), args.repeat)
+                isIdentical = result == reference
+                isSeamless = isSeamless and isIdentical
+                print(f"  {count:>3} threads  {elapsed * 1000:8.1f} ms  {baseline / elapsed:5.2f}x the Qt blur"
+                      f"  {'identical' if isIdentical else 'MISMATCH'}")
+
+    return 0 if isSeamless else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+# coding:utf-8
+"""
+Check that video backgrounds play on this machine: the pixel formats QtMultimedia maps frames to, the
+negotiated surface format, frames reaching the frame ring, looping at the end of the video and
+pausing while the window is hidden.
+
+Use a short video (a few seconds) so the loop is reached quickly.
+
+Example:
+    python check_video.py clip.mp4 --save-frame first.png
+"""
+import os
+import sys
+import time
+import argparse
+
+from PyQt5.QtCore import QSize, QCoreApplication
+from PyQt5.QtGui import QGuiApplication, QImage, qGray
+
+from app.background import video_background
+from app.background.video_background import VideoBackground
+
+
+def waitFor(condition, timeout):
+    """ process events until `condition()` is true, returns `False` on timeout """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        QCoreApplication.processEvents()
+        time.sleep(0.005)
+
+    return True
+
+
+def isBlank(image):
+    """ whether every sampled pixel of the image has the same gray level """
+    levels = {qGray(image.pixel(x, y)) for x in range(0, image.width(), max(1, image.width() // 16))
+              for y in range(0, image.height(), max(1, image.height() // 16))}
+    return len(levels) <= 1
+
+
+def report(name, isPassed, detail=""):
+    print(f"{'PASS' if isPassed else 'FAIL'}  {name}{f': {detail}' if detail else ''}")
+    return isPassed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check video background playback with QtMultimedia")
+    parser.add_argument("video", help="short video file to play")
+    parser.add_argument("--mode", default="Keep Aspect Ratio", help="display mode")
+    parser.add_argument("--blur", type=int, default=0, help="blur radius in pixels")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds to wait for the end of the video")
+    parser.add_argument("--save-frame", help="write the first composed frame here to check its orientation")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+
+    if not video_background.is_available():
+        print("FAIL  QtMultimedia cannot be imported (on Linux it needs GStreamer and PulseAudio)")
+        return 1
+
+    from PyQt5.QtMultimedia import QMediaPlayer, QVideoFrame
+
+    # Frame formats offered by the surface and the image formats their pixels are read as
+    isPassed = True
+    expected = {QVideoFrame.Format_RGB32: QImage.Format_RGB32, QVideoFrame.Format_ARGB32: QImage.Format_ARGB32,
+                QVideoFrame.Format_ARGB32_Premultiplied: QImage.Format_ARGB32_Premultiplied}
+    for pixelFormat in video_background.VideoFrameSurface.PIXEL_FORMATS:
+        imageFormat = QVideoFrame.imageFormatFromPixelFormat(pixelFormat)
+        isPassed &= report(f"imageFormatFromPixelFormat({pixelFormat})", imageFormat == expected[pixelFormat],
+                           f"QImage format {imageFormat}")
+
+    background = VideoBackground()
+    frames = []         # Number of each shown frame, only the first one is kept
+    firstFrame = QImage()
+
+    def onFrameReady():
+        # Stand in for the window: take the frame and report it painted, so the next one is shown
+        nonlocal firstFrame
+        frame = background.current_frame()
+        if not frame.isNull():
+            if firstFrame.isNull():
+                firstFrame = frame.copy()
+            frames.append(len(frames))
+        background.report_paint_time(0.0)
+
+    background.frameReady.connect(onFrameReady)
+    endings = []
+    background.set_layout(QSize(640, 360), 1.0, args.mode, args.blur)
+    background.set_source(os.path.abspath(args.video))
+    background._player.mediaStatusChanged.connect(
+        lambda status: status == QMediaPlayer.EndOfMedia and endings.append(len(frames)))
+
+    # Frame mapping
+    hasFrame = waitFor(lambda: frames, 10)
+    isPassed &= report("first frame mapped and composed", hasFrame, background._player.errorString())
+    if not hasFrame:
+        return 1
+
+    surfaceFormat = background._surface.surfaceFormat()
+    print(f"      surface format {surfaceFormat.pixelFormat()}, {surfaceFormat.frameWidth()}x"
+          f"{surfaceFormat.frameHeight()}, scan lines {surfaceFormat.scanLineDirection()}")
+    isPassed &= report("first frame has content", not isBlank(firstFrame))
+    if args.save_frame:
+        firstFrame.save(args.save_frame)
+        print(f"      first frame written to {args.save_frame}, check that it is upright")
+
+    # Looping
+    isLooped = waitFor(lambda: endings and len(frames) > endings[0] + 2, args.timeout)
+    isPassed &= report("playback loops at the end", isLooped,
+                       f"{len(endings)} end(s) reached, {len(frames)} frames shown")
+
+    # Pause on hide
+    background.set_paused(True)
+    waitFor(lambda: False, 0.3)
+    shown = len(frames)
+    waitFor(lambda: False, 1.0)
+    isPassed &= report("no frames while paused", len(frames) == shown and
+                       background._player.state() == QMediaPlayer.PausedState)
+
+    background.set_paused(False)
+    isPassed &= report("frames again after resuming", waitFor(lambda: len(frames) > shown + 2, 5))
+
+    print(f"      stats {background.get_stats()}")
+    background.stop()
+    return 0 if isPassed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
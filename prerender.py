@@ -0,0 +1,62 @@
+# coding:utf-8
+"""
+Pre-render background images into the persistent render cache loaded by the application.
+
+Example:
+    python prerender.py wallpaper.jpg --size 1920x1080 2560x1440 --dpr 1 1.5 --blur 0 20 --theme-variants
+"""
+import sys
+import time
+import argparse
+
+from app.background.background_manager import DISPLAY_MODES
+from app.background.prerender import prerender
+from app.background.render_cache import PersistentRenderCache
+
+
+def parseSize(text):
+    """ parse a `WIDTHxHEIGHT` window size """
+    try:
+        width, height = text.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{text}', expected WIDTHxHEIGHT")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render backgrounds for known screen configurations")
+    parser.add_argument("image", help="background image to render")
+    parser.add_argument("--size", type=parseSize, nargs="+", required=True,
+                        help="window sizes in device independent pixels, e.g. 1920x1080")
+    parser.add_argument("--dpr", type=float, nargs="+", default=[1.0], help="device pixel ratios")
+    parser.add_argument("--blur", type=int, nargs="+", default=[0], help="blur radii in pixels")
+    parser.add_argument("--mode", nargs="+", choices=DISPLAY_MODES, default=["Keep Aspect Ratio"],
+                        help="display modes")
+    parser.add_argument("--theme-variants", action="store_true",
+                        help="also render the light and dark theme variants")
+    parser.add_argument("--cache-dir", default=PersistentRenderCache.DEFAULT_CACHE_DIR,
+                        help="render cache directory of the application")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU cores)")
+    args = parser.parse_args(argv)
+
+    variants = [None, "light", "dark"] if args.theme_variants else [None]
+
+    start = time.perf_counter()
+    count = failures = 0
+    for job, path, error in prerender(args.image, args.size, args.dpr, args.blur, args.mode,
+                                      variants, args.cache_dir, args.jobs):
+        _, width, height, dpr, blur, mode, variant, _ = job
+        description = f"{width}x{height}@{dpr:g} blur={blur} mode={mode} variant={variant or '-'}"
+        if error:
+            failures += 1
+            print(f"failed  {description}: {error}", file=sys.stderr)
+        else:
+            count += 1
+            print(f"written {description} -> {path}")
+
+    print(f"{count} backgrounds rendered in {time.perf_counter() - start:.1f}s, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -8,6 +8,7 @@ from PyQt5.QtWidgets import QApplication
 from qfluentwidgets import FluentTranslator
 
 from app.common import cfg
+from app.common.style_sheet import styleSheetRegistry
 from app.view import MainWindow
 
 
@@ -25,6 +26,13 @@ QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
 # create application
 app = QApplication(sys.argv)
 app.setAttribute(Qt.AA_DontCreateNativeWidgetSiblings)
+app.aboutToQuit.connect(cfg.flush)
+
+# reload edited qss files in development, otherwise read all themes from the bundle at once
+if os.environ.get("QSS_WATCH"):
+    styleSheetRegistry.setWatchEnabled(True)
+else:
+    styleSheetRegistry.preload()
 
 # internationalization - set to English explicitly
 from PyQt5.QtCore import QLocale